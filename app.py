@@ -1,101 +1,274 @@
+from gevent import monkey
+
+monkey.patch_all()
+
+import atexit
+import contextlib
 import logging
 import queue
+import re
 import threading
 import time
-
-from flask import Flask, jsonify, render_template, request
+from collections import deque, namedtuple
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+
+import orjson
+from flask import Flask, Response, jsonify, make_response, render_template, request
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-
-from main import VoiceAssistant
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[logging.FileHandler('flask_app.log'), logging.StreamHandler()]
+from gevent import get_hub, spawn
+from gevent.pywsgi import WSGIServer
+from gevent.threadpool import ThreadPoolExecutor
+
+# Set up logging: records are handed to a background listener, and file writes
+# are buffered in memory until 256 records pile up or an ERROR comes in
+_log_queue = queue.SimpleQueue()
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_file_handler = logging.FileHandler('flask_app.log')
+_file_handler.setFormatter(_log_formatter)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+_log_listener = QueueListener(
+    _log_queue,
+    MemoryHandler(capacity=256, flushLevel=logging.ERROR, target=_file_handler),
+    _stream_handler
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson for faster request parsing and jsonify."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of decoding and re-encoding
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
-# Initialize the assistant with web mode enabled
-assistant = VoiceAssistant(web_mode=True)
-command_queue = queue.Queue()
-response_queue = queue.Queue()
+# Commands run on a small pool of native OS threads so a text command never waits behind a
+# voice command. monkey.patch_all() turns ordinary threads into greenlets, which would share
+# one OS thread with the server and stall it whenever the assistant blocks in C (PyAudio
+# reads, pyttsx3, mic calibration); gevent's executor always uses real threads, and its
+# futures can be waited on from request greenlets without blocking the hub.
+MAX_WORKERS = 4
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+# The server's event loop; worker threads hand streamed responses back to it through here
+_server_loop = get_hub().loop
+# One slot per worker: gevent's submit waits for a free worker with no timeout, so commands
+# must never be queued inside it. When every worker is busy, requests get a 503 instead
+_pending_commands = threading.BoundedSemaphore(MAX_WORKERS)
+# The landing page gets a worker of its own, so it never waits behind user commands
+_greeting_executor = ThreadPoolExecutor(max_workers=1)
+# Only one worker may hold the microphone at a time
+_voice_lock = threading.Lock()
+# Each worker routes assistant.speak and request_input into its own ResponseCapture
+_speech_local = threading.local()
+_original_speak = None
+_original_request_input = None
+
+# The assistant is created on first use, so workers that never handle a command
+# don't pay for importing main and probing the audio devices
+_assistant = None
+_assistant_lock = threading.Lock()
+
+
+def _routed_speak(text):
+    capture = getattr(_speech_local, 'capture', None)
+    if capture is None:
+        return _original_speak(text)
+    capture.speak(text)
+
+
+def _routed_request_input(kind):
+    # Remember that this command, and not whichever one finishes next, asked a question
+    capture = getattr(_speech_local, 'capture', None)
+    if capture is not None:
+        capture.requires_input = True
+    _original_request_input(kind)
+
+
+def get_assistant():
+    """Return the shared web-mode VoiceAssistant, creating it on first use."""
+    global _assistant, _original_speak, _original_request_input
+    if _assistant is None:
+        with _assistant_lock:
+            if _assistant is None:
+                from main import VoiceAssistant
+                # The browser does the talking; no_tts keeps pyttsx3 and its speaker thread out of the server
+                assistant = VoiceAssistant(web_mode=True, no_tts=True)
+                _original_speak = assistant.speak
+                assistant.speak = _routed_speak
+                _original_request_input = assistant.request_input
+                assistant.request_input = _routed_request_input
+                _assistant = assistant
+    return _assistant
+
+# Progress chatter that is dropped from the responses sent back to the browser
+SKIP_TOKENS = frozenset({
+    "i heard:",
+    "processing your request:",
+    "command processed",
+    "please speak clearly",
+    "trying again"
+})
+_SKIP_RE = re.compile("|".join(map(re.escape, SKIP_TOKENS)), re.IGNORECASE)
+
+def build_response(message, all_responses, success=True, should_stop=False, requires_input=False):
+    """Build the JSON body returned for a command."""
+    return {
+        'message': message,
+        'requires_input': requires_input,
+        'all_responses': all_responses,
+        'success': success,
+        'should_stop': should_stop
+    }
 
 
 class ResponseCapture:
+    __slots__ = ('response', 'responses', 'sink', 'requires_input')
+
     def __init__(self):
         self.response = None
         self.responses = []
+        self.sink = None  # Optional queue that streams each response as it is spoken
+        self.requires_input = False  # Set when this command asked the user a follow-up question
 
     def speak(self, text):
         self.response = text
         self.responses.append(text)
-        logger.info(f"Assistant response: {text}")
+        if self.sink is not None:
+            # speak runs on a worker thread; the sink belongs to the server's event loop
+            _server_loop.run_callback_threadsafe(self.sink.put, text)
 
+    def reset(self):
+        self.response = None
+        self.responses.clear()
+        self.sink = None
+        self.requires_input = False
+
+
+# Recycled ResponseCapture objects, so each command doesn't allocate a fresh one
+_capture_pool = deque(maxlen=64)
+
+
+def get_capture():
+    """Take a ResponseCapture from the pool, allocating one if the pool is empty."""
+    try:
+        return _capture_pool.pop()
+    except IndexError:
+        return ResponseCapture()
 
-def process_commands():
-    """Process commands from the queue with optimized response handling."""
-    while True:
-        try:
-            command = command_queue.get()
-            response_capture = ResponseCapture()
-            original_speak = assistant.speak
-            assistant.speak = response_capture.speak
 
+def release_capture(capture):
+    """Reset a ResponseCapture and hand it back to the pool."""
+    capture.reset()
+    _capture_pool.append(capture)
+
+
+@contextlib.contextmanager
+def capture_speech():
+    """Route the assistant's speech on this thread into a pooled ResponseCapture."""
+    response_capture = get_capture()
+    _speech_local.capture = response_capture
+    try:
+        yield response_capture
+    finally:
+        _speech_local.capture = None
+        release_capture(response_capture)
+
+
+# A queued command; is_response marks a follow-up answer to an assistant prompt, and
+# cancelled is set once the request that sent it has timed out
+Command = namedtuple('Command', 'type content is_response cancelled')
+
+
+def _handle_one(command, sink=None):
+    """Run a single command on a worker thread and build its response."""
+    if command.cancelled.is_set():
+        return build_response("Command cancelled", [], success=False)
+    try:
+        assistant = get_assistant()
+        with capture_speech() as response_capture:
+            response_capture.sink = sink
             try:
-                if command.get('type') == 'voice':
-                    handle_voice_command(command, response_capture)
-                else:
-                    handle_text_command(command, response_capture)
+                _DISPATCH.get(command.type, handle_text_command)(command, response_capture)
 
             except Exception as e:
-                logger.error(f"Error processing command: {str(e)}")
+                logger.error("Error processing command: %s", e)
                 response_capture.speak(str(e))
 
-            finally:
-                # Restore original speak method
-                assistant.speak = original_speak
-
-                # Prepare response, filtering out unnecessary messages
-                responses = [r for r in response_capture.responses if not any(
-                    skip in r.lower() for skip in [
-                        "i heard:",
-                        "processing your request:",
-                        "command processed",
-                        "please speak clearly",
-                        "trying again"
-                    ]
-                )]
-
-                last_response = responses[-1] if responses else "Command processed"
-
-                response_queue.put({
-                    'message': last_response,
-                    'requires_input': False,
-                    'all_responses': responses,
-                    'success': True,
-                    'should_stop': assistant.should_stop
-                })
+            logger.info("Assistant responses: %r", response_capture.responses)
 
-                command_queue.task_done()
+            # Prepare response, filtering out unnecessary messages
+            responses = [r for r in response_capture.responses if not _SKIP_RE.search(r)]
+            requires_input = response_capture.requires_input
 
-        except Exception as e:
-            logger.error(f"Critical error in command processing: {str(e)}")
-            response_queue.put({
-                'message': str(e),
-                'requires_input': False,
-                'all_responses': [str(e)],
-                'success': False,
-                'should_stop': False
-            })
-            command_queue.task_done()
+        last_response = responses[-1] if responses else "Command processed"
+
+        return build_response(last_response, responses, should_stop=assistant.should_stop,
+                              requires_input=requires_input)
+
+    except Exception as e:
+        logger.error("Critical error in command processing: %s", e)
+        return build_response(str(e), [str(e)], success=False)
+
+
+# Circuit breaker for the microphone: after MIC_FAILURE_LIMIT failed voice commands within
+# MIC_FAILURE_WINDOW seconds, fail fast instead of waiting out the listen timeout again
+MIC_FAILURE_LIMIT = 3
+MIC_FAILURE_WINDOW = 60
+VOICE_ATTEMPT_TIMEOUT = 2.0
+_recent_mic_failures = 0
+_last_mic_failure = 0.0
+
+
+def _record_mic_failure():
+    global _recent_mic_failures, _last_mic_failure
+    _recent_mic_failures += 1
+    _last_mic_failure = time.monotonic()
+
+
+def submit_command(command, sink=None):
+    """Submit a command to the worker pool, or return None if the server is saturated."""
+    if not _pending_commands.acquire(timeout=1.0):
+        return None
+    future = executor.submit(_handle_one, command, sink)
+    future.add_done_callback(lambda _: _pending_commands.release())
+    return future
 
 
 def handle_voice_command(command, response_capture):
     """Handle voice commands with improved error handling and feedback."""
+    # A new command drops any follow-up question the user didn't answer
+    get_assistant().take_pending_input()
+    with _voice_lock:
+        # The request may have timed out while this command waited for the microphone
+        if command.cancelled.is_set():
+            return
+        _handle_voice_locked(response_capture)
+
+
+def _handle_voice_locked(response_capture):
+    global _recent_mic_failures
+    assistant = get_assistant()
     assistant.listening = True
     logger.info("Starting voice command processing...")
 
@@ -103,64 +276,99 @@ def handle_voice_command(command, response_capture):
     if not hasattr(assistant, 'microphone'):
         raise Exception("Microphone is not properly initialized. Please check your settings.")
 
+    if time.monotonic() - _last_mic_failure > MIC_FAILURE_WINDOW:
+        _recent_mic_failures = 0
+    if _recent_mic_failures >= MIC_FAILURE_LIMIT:
+        raise Exception("Microphone unresponsive. Please check your microphone and try again shortly.")
+
     # Get voice input with retries
     max_attempts = 2  # Reduced from 3
     query = None
 
     for attempt in range(max_attempts):
         try:
-            query = assistant.take_command()
+            query = assistant.take_command(timeout=VOICE_ATTEMPT_TIMEOUT)
             if query != "None":
                 break
 
             if attempt < max_attempts - 1:
                 response_capture.speak("Please speak clearly.")
-                time.sleep(0.5)  # Reduced from 1
 
         except Exception as e:
-            logger.error(f"Error in voice recognition attempt {attempt + 1}: {str(e)}")
+            logger.error("Error in voice recognition attempt %d: %s", attempt + 1, e)
             if attempt < max_attempts - 1:
                 response_capture.speak("There was an error. Trying again...")
-                time.sleep(0.5)  # Reduced from 1
             else:
+                _record_mic_failure()
                 raise Exception("Failed to recognize voice command")
 
     if query and query != "None":
+        _recent_mic_failures = 0
         # Skip the "I heard" message to reduce verbosity
         assistant.execute_command(query)
     else:
+        _record_mic_failure()
         raise Exception("Could not understand. Please try again.")
-    
+
     assistant.listening = False
 
 
 def handle_text_command(command, response_capture):
     """Handle text commands with minimal feedback."""
-    query = command.get('content', '').strip()
+    assistant = get_assistant()
+    query = (command.content or '').strip()
     if not query:
         raise Exception("Please provide a command to process.")
 
+    # Answers to a follow-up question go back to the handler that asked it
+    # Any other command means the question was dismissed, so it is dropped
+    kind = assistant.take_pending_input()
+    if command.is_response and kind is not None:
+        assistant.handle_pending_input(query, kind)
+        return
+
     # Skip the "Processing your request" message
     assistant.execute_command(query)
 
 
-# Start command processing thread
-command_thread = threading.Thread(target=process_commands, daemon=True)
-command_thread.start()
+_DISPATCH = {
+    'voice': handle_voice_command,
+    'text': handle_text_command
+}
+
+
+# Landing-page greeting as (hour, responses); it only changes with the time of day
+_greeting_cache = None
+_greeting_lock = threading.Lock()
+
+
+def get_greeting():
+    """Return the cached greeting, running greet_me at most once per hour."""
+    global _greeting_cache
+    hour = datetime.now().hour
+    cached = _greeting_cache
+    if cached is not None and cached[0] == hour:
+        return cached[1]
+
+    with _greeting_lock:
+        if _greeting_cache is None or _greeting_cache[0] != hour:
+            with capture_speech() as response_capture:
+                get_assistant().greet_me()
+                _greeting_cache = (hour, list(response_capture.responses))
+        return _greeting_cache[1]
 
 
 @app.route('/')
 def home():
     """Render the home page with initial greeting."""
     try:
-        response_capture = ResponseCapture()
-        original_speak = assistant.speak
-        assistant.speak = response_capture.speak
-        assistant.greet_me()
-        assistant.speak = original_speak
-        return render_template('index.html', initial_greeting=response_capture.responses)
+        # Creating the assistant opens and calibrates the microphone, so keep it off the server thread
+        greeting = _greeting_executor.submit(get_greeting).result(timeout=30)
+        response = make_response(render_template('index.html', initial_greeting=greeting))
+        response.headers['Cache-Control'] = 'public, max-age=60'
+        return response
     except Exception as e:
-        logger.error(f"Error in home route: {str(e)}")
+        logger.error("Error in home route: %s", e)
         return render_template('index.html', initial_greeting=["Hello! How may I assist you?"])
 
 
@@ -180,18 +388,25 @@ def send_command():
                 'success': False
             })
 
-        command_queue.put({
-            'type': command_type,
-            'content': content
-        })
+        command = Command(command_type, content, bool(data.get('is_response')), threading.Event())
+        future = submit_command(command)
+        if future is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Server busy',
+                'requires_input': False,
+                'success': False
+            }), 503
 
         try:
-            response = response_queue.get(timeout=30)
+            response = future.result(timeout=30)
             return jsonify({
                 'status': 'success',
                 **response
             })
-        except queue.Empty:
+        except FutureTimeoutError:
+            # Nobody is waiting for the result any more; skip it if it hasn't started yet
+            command.cancelled.set()
             return jsonify({
                 'status': 'error',
                 'message': 'Command processing timeout',
@@ -200,7 +415,7 @@ def send_command():
             })
 
     except Exception as e:
-        logger.error(f"Error in send_command: {str(e)}")
+        logger.error("Error in send_command: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e),
@@ -209,6 +424,64 @@ def send_command():
         })
 
 
+# Marks the end of a streamed command in its response queue
+_STREAM_DONE = object()
+
+
+def _sse(payload):
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+@app.route('/send_command_stream', methods=['POST'])
+def send_command_stream():
+    """Stream a command's responses to the web interface as Server-Sent Events."""
+    data = request.json or {}
+    command_type = data.get('type', 'text')
+    content = data.get('content', '')
+
+    if not content and command_type == 'text':
+        return jsonify({
+            'status': 'error',
+            'message': 'Please provide a command',
+            'requires_input': False,
+            'success': False
+        })
+
+    sink = queue.SimpleQueue()
+    command = Command(command_type, content, bool(data.get('is_response')), threading.Event())
+    future = submit_command(command, sink)
+    if future is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Server busy',
+            'requires_input': False,
+            'success': False
+        }), 503
+
+    future.add_done_callback(lambda _: sink.put(_STREAM_DONE))
+
+    def generate():
+        while True:
+            try:
+                item = sink.get(timeout=30)
+            except queue.Empty:
+                command.cancelled.set()
+                yield _sse({
+                    'status': 'error',
+                    'message': 'Command processing timeout',
+                    'requires_input': False,
+                    'success': False
+                })
+                return
+
+            if item is _STREAM_DONE:
+                yield _sse({'status': 'success', 'done': True, **future.result()})
+                return
+            yield _sse({'status': 'partial', 'message': item})
+
+    return Response(generate(), mimetype='text/event-stream')
+
+
 @app.errorhandler(404)
 def not_found_error(error):
     """Handle 404 errors."""
@@ -230,4 +503,9 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    from online import warm_up_connections
+
+    # The sockets are patched, so the warm-up requests run cooperatively on the server's own loop
+    spawn(warm_up_connections)
+    # gevent serves requests concurrently, so a long voice command no longer stalls other clients
+    WSGIServer(('0.0.0.0', 5000), app).serve_forever()
\ No newline at end of file
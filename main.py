@@ -1,22 +1,44 @@
+import atexit
+import hashlib
 import logging
 import os
+import queue
+import re
+import shutil
 import subprocess as sp
+import tempfile
+import threading
 import time
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from glob import glob
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-import keyboard
-import pyttsx3
 import speech_recognition as sr
 from decouple import config
 
-from online import (chat_with_free_gpt, chat_with_gpt, find_my_ip,
-                    generate_password, get_battery_status, get_crypto_price,
-                    get_current_datetime, get_exchange_rate, get_news,
-                    get_stock_price, search_on_google, search_on_wikipedia,
-                    send_email, set_reminder, weather_forecast, youtube)
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+from matcher import FuzzyMatcher, PhraseMatcher
+from online import (_SESSION, chat_with_free_gpt, chat_with_gpt,
+                    find_my_ip, flush_reminders, generate_password,
+                    get_battery_status, get_crypto_price, get_current_datetime,
+                    get_exchange_rate, get_news_stream, get_stock_price,
+                    search_on_google, search_on_wikipedia, send_email,
+                    set_reminder, warm_up_connections, weather_forecast,
+                    youtube)
 
 # Set up logging
 logging.basicConfig(
@@ -27,27 +49,182 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Canonical commands and the phrases that trigger them, in priority order
+COMMAND_PATTERNS = {
+    "stop assistant": ("stop", "exit", "quit", "bye", "goodbye", "shut down", "shutdown", "turn off"),
+    "youtube": ("youtube", "play"),
+    "google": ("google", "search"),
+    "wikipedia": ("wikipedia",),
+    "weather": ("weather",),
+    "news": ("news",),
+    "email": ("email",),
+    "reminder": ("reminder",),
+    "stock": ("stock",),
+    "exchange rate": ("exchange rate",),
+    "password": ("password",),
+    "crypto": ("crypto",),
+    "battery": ("battery",),
+    "time": ("time",),
+    "gpt": ("gpt", "chat"),
+    "open": ("open",),
+}
+
+# A query that is exactly one of the phrases resolves with a single dict lookup
+EXACT_LOOKUP = {phrase: command for command, phrases in COMMAND_PATTERNS.items() for phrase in phrases}
+
+# Stop phrases must be whole words so "quite" or "stopwatch" don't shut the assistant down
+STOP_RE = re.compile(r"\b(?:%s)\b" % "|".join(map(re.escape, COMMAND_PATTERNS["stop assistant"])))
+
+# Built once at import time and shared by every assistant instance
+COMMAND_MATCHER = PhraseMatcher(
+    (phrase, command) for command, phrases in COMMAND_PATTERNS.items() for phrase in phrases
+    if command != "stop assistant"
+)
+
+
+# Input devices whose names contain these words are preferred; output devices are never used
+PREFERRED_MIC_RE = re.compile(r"array|mic|input")
+OUTPUT_DEVICE_RE = re.compile(r"output")
+
+# Whitespace after sentence-ending punctuation; streamed answers are spoken a sentence at a time
+SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Part of the day for each hour, so greet_me indexes instead of branching
+HOUR_GREETING = ("Night",) * 6 + ("Morning",) * 6 + ("Afternoon",) * 4 + ("Evening",) * 3 + ("Night",) * 5
+
+# Where to look for applications the assistant can open, checked on first use
+KNOWN_APPS = {
+    "vs code": {
+        "commands": ("code",),
+        "paths": (r"%LOCALAPPDATA%\Programs\Microsoft VS Code\Code.exe",
+                  r"%ProgramFiles%\Microsoft VS Code\Code.exe"),
+    },
+    "discord": {
+        "commands": ("discord",),
+        "paths": (r"%LOCALAPPDATA%\Discord\app-*\Discord.exe",),
+    },
+}
+
+# Things "open ..." can launch and the phrases that name them, in priority order
+OPEN_TARGETS = {
+    "cmd": ("command prompt", "cmd"),
+    "camera": ("camera",),
+    "notepad": ("notepad",),
+    "discord": ("discord",),
+    "vs code": ("vs code", "visual studio code"),
+}
+OPEN_MATCHER = PhraseMatcher(
+    (phrase, target) for target, phrases in OPEN_TARGETS.items() for phrase in phrases
+)
+
+# Misheard commands ("whether", "you tube") fall back to fuzzy matching; a near-miss
+# must never shut the assistant down, so the stop phrases are left out
+FUZZY_MATCHER = FuzzyMatcher(
+    (phrase, command) for command, phrases in COMMAND_PATTERNS.items() for phrase in phrases
+    if command != "stop assistant"
+)
+
+
+@lru_cache(maxsize=1)
+def load_response_table(path: str):
+    """Parse the canned responses once per process and build their matcher."""
+    with open(path, 'r') as file:
+        responses = json.load(file)
+    # Queries are lowercased before matching, so the keys must be too
+    return responses, PhraseMatcher((key.lower(), value) for key, value in responses.items())
+
+
 class VoiceAssistant:
-    def __init__(self, web_mode=False):
-        # Initialize Text-to-Speech Engine
-        self.engine = pyttsx3.init('sapi5')
-        self.engine.setProperty('volume', 1.0)
-        self.engine.setProperty('rate', 180)
-        voices = self.engine.getProperty('voices')
-        self.engine.setProperty('voice', voices[0].id)
+    # Command words stripped from a query to leave just the search term
+    YOUTUBE_FILLER = frozenset({"youtube", "play", "on", "search", "for"})
+    GOOGLE_FILLER = frozenset({"google", "search", "for", "on"})
+    WIKIPEDIA_FILLER = frozenset({"wikipedia", "search", "for", "on", "wiki"})
+
+    # Rendered speech is cached as WAV files so repeated phrases skip synthesis
+    TTS_CACHE_DIR = Path(tempfile.gettempdir()) / 'buddy_tts'
+    TTS_CACHE_SIZE = 256
+
+    # Seconds between ambient-noise recalibrations of the microphone
+    RECALIBRATE_INTERVAL = 300
+
+    # Calibrated energy thresholds are remembered per microphone across restarts
+    MIC_PROFILE = Path.home() / '.buddy' / 'mic_profile.json'
+    MIC_PROFILE_MAX_AGE = 24 * 60 * 60
+
+    # Voice activity detection works on 30 ms frames of 16 kHz audio
+    VAD_SAMPLE_RATE = 16000
+    VAD_FRAME_SAMPLES = 480
+    VAD_SILENCE_FRAMES = 10  # 300 ms of silence ends the phrase
+
+    def __init__(self, web_mode=False, no_tts=False):
+        # Text-to-speech runs on its own thread so callers don't wait for playback;
+        # with no_tts the engine is never loaded and speak() only records the text
+        self.engine = None
+        self.no_tts = no_tts
+        self._tts_cache = OrderedDict()
+        self._speak_queue = queue.Queue()
+        if not no_tts:
+            if winsound is not None:
+                self.TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                self._load_tts_cache()
+            self._speak_thread = threading.Thread(target=self._speak_loop, daemon=True)
+            self._speak_thread.start()
 
         # Load Configurations
         self.user = config('USER', default="User  ")
         self.bot = config('BOT', default="Jarvis")
-        self.listening = False
+        self.languages = [lang.strip() for lang in config('LANGUAGE', default="en-US").split(',') if lang.strip()]
+        self._listen_event = threading.Event()
         self.web_mode = web_mode
         self.pending_input = None
+        self._pending_lock = threading.Lock()
+        self._mic_lock = threading.Lock()
         self.last_response = None
         self.should_stop = False
 
         # Load responses from JSON file
         self.load_responses()
 
+        # Dispatch on the canonical command found by COMMAND_MATCHER
+        self.command_handlers = {
+            "stop assistant": lambda query: self.handle_stop(),
+            "youtube": lambda query: self.handle_youtube(
+                self.extract_search_term(query.split(), self.YOUTUBE_FILLER)),
+            "google": lambda query: self.handle_google_search(
+                self.extract_search_term(query.split(), self.GOOGLE_FILLER)),
+            "wikipedia": lambda query: self.handle_wikipedia(
+                self.extract_search_term(query.split(), self.WIKIPEDIA_FILLER)),
+            "weather": lambda query: self.handle_weather(),
+            "news": lambda query: self.handle_news(),
+            "email": lambda query: self.handle_email(),
+            "reminder": lambda query: self.handle_reminder(),
+            "stock": lambda query: self.handle_stock_price(),
+            "exchange rate": lambda query: self.handle_exchange_rate(),
+            "password": lambda query: self.handle_password(),
+            "crypto": lambda query: self.handle_crypto_price(),
+            "battery": lambda query: self.handle_battery_status(),
+            "time": lambda query: self.handle_datetime(),
+            "gpt": lambda query: self.handle_gpt(),
+            "open": self.handle_open,
+        }
+
+        # Follow-up answers in web mode, keyed by the pending_input a handler left behind
+        self._pending_handlers = {
+            "password_length": self._answer_password_length,
+        }
+
+        # The online helpers' pooled session, so the connections warmed at start-up are the ones reused
+        self.http = _SESSION
+        if not web_mode:
+            # The web server warms the pool from its own event loop instead
+            threading.Thread(target=warm_up_connections, name='online-warmup', daemon=True).start()
+
+        # Application install locations, resolved on first use and then remembered
+        self._app_paths = {}
+
+        # Recognize in every configured language at once rather than one after another
+        self._recognition_pool = ThreadPoolExecutor(max_workers=max(len(self.languages), 1))
+
         # Initialize speech recognizer and microphone
         self.initialize_microphone()
 
@@ -57,85 +234,253 @@ class VoiceAssistant:
     def load_responses(self):
         """Load responses from a JSON file."""
         try:
-            with open('responses.json', 'r') as file:
-                self.responses = json.load(file)
+            self.responses, self._response_matcher = load_response_table('responses.json')
             logger.info("Responses loaded successfully.")
         except Exception as e:
             logger.error(f"Error loading responses: {str(e)}")
-            self.responses = {}
+            self.responses, self._response_matcher = {}, PhraseMatcher(())
 
     def initialize_microphone(self):
         """Initialize the microphone for speech recognition."""
+        self._last_calibration = 0.0
+        self._mic_source = None
+        self.vad = webrtcvad.Vad(3) if webrtcvad is not None else None
         try:
             self.recognizer = sr.Recognizer()
+            # Start from the library's default threshold and let it adapt; end a phrase after
+            # 0.3 s of silence and never wait more than 5 s on Google
+            self.recognizer.energy_threshold = 300
+            self.recognizer.dynamic_energy_threshold = True
+            self.recognizer.pause_threshold = 0.3
+            self.recognizer.non_speaking_duration = 0.2
+            self.recognizer.operation_timeout = 5
             mics = sr.Microphone.list_microphone_names()
             logger.info(f"Available microphones: {mics}")
 
             mic_index = self.select_microphone(mics)
-            if mic_index is not None:
+            if mic_index is None:
+                raise Exception("No suitable microphone found")
+
+            if self.vad is not None:
+                # VAD decides where speech starts and ends, so no noise calibration is needed
+                try:
+                    self.microphone = sr.Microphone(device_index=mic_index, sample_rate=self.VAD_SAMPLE_RATE,
+                                                    chunk_size=self.VAD_FRAME_SAMPLES)
+                    self._open_microphone()
+                    logger.info("Microphone initialized successfully (voice activity detection)")
+                except Exception as e:
+                    # Not every device can record 16 kHz mono; use the energy threshold instead
+                    logger.warning(f"Voice activity detection unavailable on this microphone: {str(e)}")
+                    self.vad = None
+
+            if self.vad is None:
                 self.microphone = sr.Microphone(device_index=mic_index)
-                with self.microphone as source:
-                    self.recognizer.energy_threshold = 4000
-                    self.recognizer.dynamic_energy_threshold = True
-                    self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                self._mic_name = mics[mic_index]
+                self._open_microphone()
+
+                threshold = self._load_mic_profile()
+                if threshold is not None:
+                    self.recognizer.energy_threshold = threshold
+                    self._last_calibration = time.monotonic()
+                    logger.info("Microphone initialized successfully (saved calibration)")
+                else:
+                    self.recognizer.adjust_for_ambient_noise(self._mic_source, duration=1)
+                    self._last_calibration = time.monotonic()
+                    self._save_mic_profile()
                     logger.info("Microphone initialized successfully")
-            else:
-                raise Exception("No suitable microphone found")
         except Exception as e:
             logger.error(f"Error initializing microphone: {str(e)}")
             self.speak("Warning: There was an issue initializing the microphone. Voice commands may not work properly.")
 
+    def _open_microphone(self) -> None:
+        """Open the input stream once and keep it open for every take_command."""
+        self._mic_source = self.microphone.__enter__()
+        atexit.register(self.close_microphone)
+
+    def close_microphone(self) -> None:
+        """Close the shared input stream."""
+        if self._mic_source is not None:
+            self._mic_source = None
+            self.microphone.__exit__(None, None, None)
+
+    def _drain_microphone(self) -> None:
+        """Discard audio buffered while we weren't listening, e.g. the tail of our own speech."""
+        stream = self._mic_source.stream.pyaudio_stream
+        available = stream.get_read_available()
+        if available:
+            stream.read(available, exception_on_overflow=False)
+
+    def _load_mic_profile(self) -> Optional[float]:
+        """Return the saved energy threshold for the current microphone, if it is recent enough."""
+        try:
+            with open(self.MIC_PROFILE, 'r') as file:
+                profile = json.load(file).get(self._mic_name)
+        except (OSError, ValueError):
+            return None
+        if not profile or time.time() - profile.get('ts', 0) > self.MIC_PROFILE_MAX_AGE:
+            return None
+        return profile.get('threshold')
+
+    def _save_mic_profile(self) -> None:
+        """Remember the current energy threshold for this microphone."""
+        try:
+            with open(self.MIC_PROFILE, 'r') as file:
+                profiles = json.load(file)
+        except (OSError, ValueError):
+            profiles = {}
+        profiles[self._mic_name] = {'threshold': self.recognizer.energy_threshold, 'ts': time.time()}
+        try:
+            self.MIC_PROFILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.MIC_PROFILE, 'w') as file:
+                json.dump(profiles, file)
+        except OSError as e:
+            logger.warning(f"Could not save microphone profile: {str(e)}")
+
     def select_microphone(self, mics):
         """Select the best microphone based on keywords."""
-        preferred_keywords = ["array", "mic", "input"]
         mic_index = None
+        fallback_index = None
 
+        # One pass: the first keyword match wins, otherwise the first non-output device
         for index, name in enumerate(mics):
             name_lower = name.lower()
-            if any(keyword in name_lower for keyword in preferred_keywords) and "output" not in name_lower:
+            if OUTPUT_DEVICE_RE.search(name_lower):
+                continue
+            if PREFERRED_MIC_RE.search(name_lower):
                 mic_index = index
                 logger.info(f"Selected microphone: {name}")
                 break
+            if fallback_index is None:
+                fallback_index = index
 
-        if mic_index is None and len(mics) > 0:
-            for index, name in enumerate(mics):
-                if "output" not in name.lower():
-                    mic_index = index
-                    logger.info(f"Using default microphone: {name}")
-                    break
+        if mic_index is None and fallback_index is not None:
+            mic_index = fallback_index
+            logger.info(f"Using default microphone: {mics[mic_index]}")
 
         return mic_index
 
     def setup_hotkeys(self):
         """Set up keyboard hotkeys for voice control."""
-        keyboard.add_hotkey('k', self.start_listening)
-        keyboard.add_hotkey('ctrl+alt+p', self.stop_listening)
+        from pynput.keyboard import GlobalHotKeys
+
+        # OS-level hotkeys only wake us when a combo fires, unlike a hook on every keystroke
+        self._hotkeys = GlobalHotKeys({
+            'k': self.start_listening,
+            '<ctrl>+<alt>+p': self.stop_listening,
+        })
+        self._hotkeys.start()
 
     def speak(self, text: str) -> None:
-        """Speak out the given text with optimized settings."""
+        """Queue the given text to be spoken and return immediately."""
         if text and isinstance(text, str):
+            if self.no_tts:
+                logger.info(f"Assistant said: {text}")
+            else:
+                self._speak_queue.put(text)
+            self.last_response = text
+
+    def speak_sync(self, text: str) -> None:
+        """Speak the given text and wait until it has finished playing."""
+        self.speak(text)
+        self.wait_until_spoken()
+
+    def speak_many(self, texts) -> None:
+        """Speak several fragments as one utterance, ending each with a sentence break."""
+        sentences = []
+        for text in texts:
+            text = text.strip() if isinstance(text, str) else ""
+            if text:
+                sentences.append(text if text[-1] in ".!?:" else text + ".")
+        if sentences:
+            self.speak(" ".join(sentences))
+
+    def speak_stream(self, pieces) -> None:
+        """Speak streamed text, starting on each sentence as soon as it is complete."""
+        if self.web_mode:
+            # The web client shows the final spoken message, so send the answer whole
+            self.speak("".join(pieces).strip())
+            return
+
+        buffer = ""
+        for piece in pieces:
+            buffer += piece
+            *sentences, buffer = SENTENCE_BREAK_RE.split(buffer)
+            for sentence in sentences:
+                self.speak(sentence)
+        self.speak(buffer.strip())
+
+    def wait_until_spoken(self) -> None:
+        """Block until everything queued by speak() has been played."""
+        self._speak_queue.join()
+
+    def _speak_loop(self) -> None:
+        """Own the TTS engine and play queued text in order."""
+        try:
+            # Imported here: pyttsx3 loads COM and the SAPI voice registry, which is slow
+            import pyttsx3
+
+            # SAPI engines must be used from the thread that created them
+            self.engine = pyttsx3.init('sapi5')
+            self.engine.setProperty('volume', 1.0)
+            self.engine.setProperty('rate', 180)
+            voices = self.engine.getProperty('voices')
+            self.engine.setProperty('voice', voices[0].id)
+            # Pay SAPI's cold-start cost now rather than on the first real sentence
+            self.engine.say('')
+            self.engine.runAndWait()
+        except Exception as e:
+            logger.error(f"Error initializing text-to-speech: {str(e)}")
+
+        while True:
+            text = self._speak_queue.get()
             try:
-                self.engine.say(text)
-                self.engine.runAndWait()
+                if winsound is not None:
+                    winsound.PlaySound(str(self._tts_wav(text)), winsound.SND_FILENAME)
+                else:
+                    self.engine.say(text)
+                    self.engine.runAndWait()
                 logger.info(f"Assistant said: {text}")
-                self.last_response = text
             except Exception as e:
                 logger.error(f"Error in speech: {str(e)}")
+            finally:
+                self._speak_queue.task_done()
+
+    def _tts_wav(self, text: str) -> Path:
+        """Return a WAV file with `text` spoken, rendering it only the first time."""
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+        path = self._tts_cache.get(key)
+        if path is not None and path.exists():
+            self._tts_cache.move_to_end(key)
+            return path
+
+        path = self.TTS_CACHE_DIR / f"{key}.wav"
+        if not path.exists():
+            self.engine.save_to_file(text, str(path))
+            self.engine.runAndWait()
+        self._tts_cache[key] = path
+        self._trim_tts_cache()
+        return path
+
+    def _load_tts_cache(self) -> None:
+        """Adopt the WAV files left by earlier runs, oldest first, so they count toward the limit."""
+        wavs = sorted(self.TTS_CACHE_DIR.glob('*.wav'), key=lambda wav: wav.stat().st_mtime)
+        for wav in wavs:
+            self._tts_cache[wav.stem] = wav
+        self._trim_tts_cache()
+
+    def _trim_tts_cache(self) -> None:
+        """Drop the least recently spoken phrases once the cache is full."""
+        while len(self._tts_cache) > self.TTS_CACHE_SIZE:
+            _, stale = self._tts_cache.popitem(last=False)
+            try:
+                stale.unlink()
+            except OSError:
+                pass
 
     def greet_me(self) -> None:
         """Greet the user based on the time of the day with voice."""
         try:
-            hour = datetime.now().hour
-            greeting = "Good "
-            if 6 <= hour < 12:
-                greeting += "Morning"
-            elif 12 <= hour < 16:
-                greeting += "Afternoon"
-            elif 16 <= hour < 19:
-                greeting += "Evening"
-            else:
-                greeting += "Night"
-
+            greeting = "Good " + HOUR_GREETING[datetime.now().hour]
             initial_greeting = f"{greeting} {self.user}. I am {self.bot}. How may I assist you?"
             self.speak(initial_greeting)
             logger.info("Greeting delivered successfully")
@@ -147,6 +492,17 @@ class VoiceAssistant:
             logger.error(f"Error in greeting: {str(e)}")
             self.speak("Hello! How may I assist you?")
 
+    @property
+    def listening(self) -> bool:
+        return self._listen_event.is_set()
+
+    @listening.setter
+    def listening(self, value: bool) -> None:
+        if value:
+            self._listen_event.set()
+        else:
+            self._listen_event.clear()
+
     def start_listening(self) -> None:
         self.listening = True
         logger.info("Started Listening...")
@@ -155,35 +511,45 @@ class VoiceAssistant:
         self.listening = False
         logger.info("Stopped Listening...")
 
-    def take_command(self) -> str:
+    def take_command(self, timeout: float = 5) -> str:
         """Recognize and process user voice input with improved reliability."""
         query = "None"
 
+        # Finish speaking first so the assistant doesn't hear itself
+        self.wait_until_spoken()
+
         try:
-            with self.microphone as source:
+            # One stream and one recognizer are shared by every caller, including web
+            # commands running side by side, so only one of them may listen at a time
+            with self._mic_lock:
+                source = self._mic_source
+                if source is None:
+                    raise Exception("Microphone is not available")
+                self._drain_microphone()
+
+                # Ambient calibration is done at startup; only redo it when it has gone stale
+                if self.vad is None and time.monotonic() - self._last_calibration > self.RECALIBRATE_INTERVAL:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
+                    self._last_calibration = time.monotonic()
+                    self._save_mic_profile()
+
                 logger.info("Listening...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
-                self.recognizer.energy_threshold = 2500
-                self.recognizer.dynamic_energy_threshold = True
-                self.recognizer.pause_threshold = 0.5
 
                 try:
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
+                    if self.vad is not None:
+                        audio = self.listen_with_vad(source, timeout=timeout, phrase_time_limit=5)
+                    else:
+                        audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=5)
                     logger.info("Audio captured, recognizing...")
                 except Exception as e:
                     logger.error(f"Error capturing audio: {str(e)}")
                     return "None"
 
-                try:
-                    query = self.recognizer.recognize_google(audio)
-                    if query and query.strip():
-                        logger.info(f"Successfully recognized: '{query}'")
-                        return query.lower().strip()
-                except sr.UnknownValueError:
-                    return "None"
-                except sr.RequestError as e:
-                    logger.error(f"Could not request results; {str(e)}")
-                    return "None"
+            query = self.recognize(audio)
+            query = query.strip() if query else None
+            if query:
+                logger.info(f"Successfully recognized: '{query}'")
+                return query
 
         except Exception as e:
             logger.error(f"Error in speech recognition: {str(e)}")
@@ -191,13 +557,88 @@ class VoiceAssistant:
 
         return "None"
 
+    def listen_with_vad(self, source, timeout: float, phrase_time_limit: float) -> sr.AudioData:
+        """Record one phrase, using WebRTC VAD to find where speech starts and stops."""
+        frame_seconds = source.CHUNK / source.SAMPLE_RATE
+        max_frames = int(phrase_time_limit / frame_seconds)
+        frames = []
+        silent_frames = 0
+        waited = 0.0
+
+        while True:
+            frame = source.stream.read(source.CHUNK)
+            if self.vad.is_speech(frame, source.SAMPLE_RATE):
+                frames.append(frame)
+                silent_frames = 0
+            elif frames:
+                frames.append(frame)
+                silent_frames += 1
+                if silent_frames >= self.VAD_SILENCE_FRAMES:
+                    break
+            else:
+                waited += frame_seconds
+                if waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+            if len(frames) >= max_frames:
+                break
+
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def ask(self, prompt: str) -> Optional[str]:
+        """Speak a follow-up question and return the spoken reply, or None if nothing was understood."""
+        self.speak(prompt)
+        reply = self.take_command()
+        return reply if reply and reply != "None" else None
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _resolve_command(query: str) -> Optional[str]:
+        """Map a normalized query to its canonical command; repeated phrases hit the cache."""
+        command = EXACT_LOOKUP.get(query)
+        if command is None and STOP_RE.search(query):
+            command = "stop assistant"
+        if command is None:
+            command = COMMAND_MATCHER.first(query)
+        if command is None:
+            command = FUZZY_MATCHER.best(query)
+        return command
+
+    def recognize(self, audio: sr.AudioData) -> Optional[str]:
+        """Transcribe audio, returning the first successful result across the configured languages."""
+        if len(self.languages) <= 1:
+            language = self.languages[0] if self.languages else "en-US"
+            return self._recognize_google(audio, language)
+
+        futures = [self._recognition_pool.submit(self._recognize_google, audio, language)
+                   for language in self.languages]
+        try:
+            for future in as_completed(futures):
+                query = future.result()
+                if query:
+                    return query
+        finally:
+            for future in futures:
+                future.cancel()
+        return None
+
+    def _recognize_google(self, audio: sr.AudioData, language: str) -> Optional[str]:
+        try:
+            return self.recognizer.recognize_google(audio, language=language)
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            logger.error(f"Could not request results; {str(e)}")
+            return None
+
     def execute_command(self, query: str) -> None:
         """Execute the appropriate action based on the voice command."""
         if not query or query == "None":
             self.speak("I couldn't hear you clearly. Please try again.")
             return
 
-        query = query.lower().strip()
+        # Normalize once: lowercase, and collapse whitespace so repeated phrases hit the caches
+        query = " ".join(query.lower().split())
         logger.info(f"Processing command: {query}")
 
         # Check for normal question answers
@@ -206,122 +647,89 @@ class VoiceAssistant:
             self.speak(response)
             return
 
-        # Handle stop commands first
-        stop_commands = ["stop", "exit", "quit", "bye", "goodbye", "shut down", "shutdown", "turn off"]
-        if any(cmd in query for cmd in stop_commands):
-            self.handle_stop()
+        command = self._resolve_command(query)
+        if command is None:
+            self.speak("I'm not sure what you want me to do. Could you please rephrase that?")
             return
 
-        # Handle search commands
-        try:
-            # YouTube commands
-            if "youtube" in query or "play" in query:
-                search_term = self.extract_search_term(query, ["youtube", "play", "on", "search", "for"])
-                if search_term:
-                    youtube(search_term)
-                    self.speak(f"Playing {search_term} on YouTube")
-                    return
-                else:
-                    self.speak("What would you like to play on YouTube?")
-                    search_term = self.take_command()
-                    if search_term != "None":
-                        youtube(search_term)
-                        self.speak(f"Playing {search_term} on YouTube")
-                    return
-
-            # Google search commands
-            if "google" in query or "search" in query:
-                search_term = self.extract_search_term(query, ["google", "search", "for", "on"])
-                if search_term:
-                    self.speak(f"Searching Google for {search_term}")
-                    search_on_google(search_term)
-                    return
-                else:
-                    self.speak("What would you like to search for?")
-                    search_term = self.take_command()
-                    if search_term != "None":
-                        self.speak(f"Searching Google for {search_term}")
-                        search_on_google(search_term)
-                    return
+        self.command_handlers[command](query)
 
-            # Wikipedia commands
-            if "wikipedia" in query:
-                search_term = self.extract_search_term(query, ["wikipedia", "search", "for", "on", "wiki"])
-                if search_term:
-                    self.speak(f"Searching Wikipedia for {search_term}")
-                    result = search_on_wikipedia(search_term)
-                    self.speak(result)
-                    return
-                else:
-                    self.speak("What would you like to look up on Wikipedia?")
-                    search_term = self.take_command()
-                    if search_term != "None":
-                        self.speak(f"Searching Wikipedia for {search_term}")
-                        result = search_on_wikipedia(search_term)
-                        self.speak(result)
-                    return
+    def request_input(self, kind: str) -> None:
+        """Mark that the web client should answer a follow-up question of the given kind."""
+        with self._pending_lock:
+            self.pending_input = kind
 
-            # Handle other commands
-            if "weather" in query:
-                self.handle_weather()
-            elif "news" in query:
-                self.handle_news()
-            elif "email" in query:
-                self.handle_email()
-            elif "reminder" in query:
-                self.handle_reminder()
-            elif "stock" in query:
-                self.handle_stock_price()
-            elif "exchange rate" in query:
-                self.handle_exchange_rate()
-            elif "password" in query:
-                self.handle_password()
-            elif "crypto" in query:
-                self.handle_crypto_price()
-            elif "battery" in query:
-                self.handle_battery_status()
-            elif "time" in query:
-                self.handle_datetime()
-            elif "gpt" in query or "chat" in query:
-                self.handle_gpt()
-            elif "open" in query:
-                if "command prompt" in query or "cmd" in query:
-                    os.system('start cmd')
-                elif "camera" in query:
-                    sp.run('start microsoft.windows.camera:', shell=True)
-                elif "notepad" in query:
-                    os.system('notepad')
-                elif "discord" in query:
-                    self.open_application(r"%LOCALAPPDATA%\Discord\app-*\Discord.exe")
-                elif "vs code" in query or "visual studio code" in query:
-                    self.open_application("vs code")
-            else:
-                self.speak("I'm not sure what you want me to do. Could you please rephrase that?")
+    def take_pending_input(self) -> Optional[str]:
+        """Return the outstanding follow-up question, if any, and clear it."""
+        with self._pending_lock:
+            kind, self.pending_input = self.pending_input, None
+        return kind
 
-        except Exception as e:
-            logger.error(f"Error executing command: {str(e)}")
-            self.speak(f"I encountered an error: {str(e)}")
+    def handle_pending_input(self, reply: str, kind: Optional[str]) -> None:
+        """Route a web-mode follow-up answer to the handler that asked for it."""
+        handler = self._pending_handlers.get(kind)
+        if handler is None:
+            self.execute_command(reply)
+        else:
+            handler(reply.strip())
+
+    def handle_open(self, query: str) -> None:
+        """Open an application named in the query."""
+        target = OPEN_MATCHER.first(query)
+        if target == "cmd":
+            sp.Popen(['cmd.exe'], creationflags=sp.CREATE_NEW_CONSOLE)
+        elif target == "camera":
+            os.startfile('microsoft.windows.camera:')
+        elif target == "notepad":
+            sp.Popen(['notepad.exe'])
+        elif target is not None:
+            self.open_application(target)
+        else:
+            self.speak("I'm not sure which application you want me to open.")
+
+    @staticmethod
+    def _find_app(name: str) -> Optional[Path]:
+        """Find the installed location of a known application."""
+        locations = KNOWN_APPS.get(name)
+        if locations is None:
+            return None
+        found = next(filter(None, map(shutil.which, locations["commands"])), None)
+        if found is None:
+            for pattern in locations["paths"]:
+                # Newest versioned install directory wins (e.g. Discord's app-* folders)
+                matches = sorted(glob(os.path.expandvars(pattern)), reverse=True)
+                if matches:
+                    found = matches[0]
+                    break
+        return Path(found) if found else None
+
+    def open_application(self, name: str) -> None:
+        """Open a known application by name."""
+        path = self._app_paths.get(name)
+        if path is None:
+            # Only hits are cached, so an app installed later is still found
+            path = self._find_app(name)
+            if path is None:
+                self.speak(f"Sorry, I couldn't find {name} on this computer.")
+                return
+            self._app_paths[name] = path
+        os.startfile(path)
+        self.speak(f"Opening {name}")
 
     def get_response(self, query: str) -> Optional[str]:
         """Get a response from the loaded JSON data based on the query."""
-        for key in self.responses:
-            if key in query:
-                return self.responses[key]
-        return None
+        return self._response_matcher.first(query)
 
-    def extract_search_term(self, query: str, words_to_remove: list) -> Optional[str]:
-        """Extract search term from query by removing command words."""
-        query_words = query.split()
-        search_words = [word for word in query_words if word not in words_to_remove]
-        return " ".join(search_words).strip() if search_words else None
+    def extract_search_term(self, tokens: list, words_to_remove: frozenset) -> Optional[str]:
+        """Extract search term from the query's words by removing command words."""
+        return " ".join(word for word in tokens if word not in words_to_remove) or None
 
     def handle_youtube(self, search_term: Optional[str] = None) -> None:
         """Handle YouTube commands with improved search term handling."""
         try:
             if not search_term:
-                self.speak("What would you like to play on YouTube?")
-                search_term = self.take_command()
-                if search_term == "None":
+                search_term = self.ask("What would you like to play on YouTube?")
+                if not search_term:
                     self.speak("I couldn't understand what you want to play. Please try again.")
                     return
 
@@ -338,9 +746,8 @@ class VoiceAssistant:
         """Handle Google search with improved search term handling."""
         try:
             if not search_term:
-                self.speak("What would you like to search for on Google?")
-                search_term = self.take_command()
-                if search_term == "None":
+                search_term = self.ask("What would you like to search for on Google?")
+                if not search_term:
                     self.speak("I couldn't understand what you want to search. Please try again.")
                     return
 
@@ -357,15 +764,14 @@ class VoiceAssistant:
         """Handle Wikipedia search with improved search term handling."""
         try:
             if not search_term:
-                self.speak("What would you like to look up on Wikipedia?")
-                search_term = self.take_command()
-                if search_term == "None":
+                search_term = self.ask("What would you like to look up on Wikipedia?")
+                if not search_term:
                     self.speak("I couldn't understand what you want to search. Please try again.")
                     return
 
             if search_term:
                 self.speak(f"Searching Wikipedia for {search_term}")
-                result = search_on_wikipedia(search_term)
+                result = search_on_wikipedia(search_term, session=self.http)
                 self.speak(result)
             else:
                 self.speak("I couldn't understand what you want to search. Please try again.")
@@ -376,16 +782,16 @@ class VoiceAssistant:
     def handle_news(self) -> None:
         """Handle news with better conversation flow."""
         try:
+            # The intro plays from the speech queue while the headlines are fetched
             self.speak("Here are the latest headlines:")
-            headlines = get_news()
+            # Limit to 3 headlines to avoid too much talking; each is spoken as soon as it arrives
+            spoken = False
+            for headline in get_news_stream(session=self.http, limit=3):
+                self.speak(headline)
+                spoken = True
 
-            if not headlines:
+            if not spoken:
                 self.speak("Sorry, I couldn't fetch any news at the moment.")
-                return
-
-            for headline in headlines[:3]:  # Limit to 3 headlines to avoid too much talking
-                self.speak(headline)
-                time.sleep(0.5)  # Brief pause between headlines
 
         except Exception as e:
             logger.error(f"Error fetching news: {str(e)}")
@@ -395,15 +801,14 @@ class VoiceAssistant:
         """Improved weather handling with better conversation flow."""
         try:
             if not city:
-                self.speak("What city would you like to know the weather for?")
-                city = self.take_command()
+                city = self.ask("What city would you like to know the weather for?")
 
-                if city == "None":
+                if not city:
                     self.speak("I couldn't understand the city name. Please try again.")
                     return
 
             # Don't announce fetching, just get the data
-            weather_data = weather_forecast(city)
+            weather_data = weather_forecast(city, session=self.http)
 
             if not weather_data or not any(weather_data):
                 self.speak(f"Sorry, I couldn't find weather information for {city}")
@@ -432,23 +837,20 @@ class VoiceAssistant:
         """Handle email with better conversation flow."""
         try:
             # Get recipient
-            self.speak("Who would you like to send the email to?")
-            receiver_email = self.take_command()
-            if not receiver_email or receiver_email == "None":
+            receiver_email = self.ask("Who would you like to send the email to?")
+            if not receiver_email:
                 self.speak("I couldn't understand the email address.")
                 return
 
             # Get subject
-            self.speak("What should be the subject of the email?")
-            subject = self.take_command()
-            if not subject or subject == "None":
+            subject = self.ask("What should be the subject of the email?")
+            if not subject:
                 self.speak("I couldn't understand the subject.")
                 return
 
             # Get message
-            self.speak("What message would you like to send?")
-            message = self.take_command()
-            if not message or message == "None":
+            message = self.ask("What message would you like to send?")
+            if not message:
                 self.speak("I couldn't understand the message.")
                 return
 
@@ -467,21 +869,21 @@ class VoiceAssistant:
     def handle_reminder(self) -> None:
         """Handle reminders with better conversation flow."""
         # Get task
-        self.speak("What should I remind you about?")
-        task = self.take_command()
-        if not task or task == "None":
+        task = self.ask("What should I remind you about?")
+        if not task:
             self.speak("I couldn't understand the task.")
             return
 
         # Get time
-        self.speak("At what time? Please say the time like 10:30 AM.")
-        time_str = self.take_command()
-        if not time_str or time_str == "None":
+        time_str = self.ask("At what time? Please say the time like 10:30 AM.")
+        if not time_str:
             self.speak("I couldn't understand the time.")
             return
 
         try:
-            response = set_reminder(task, time_str)
+            # Under the web server's gevent patching the flush timer would be a greenlet that only
+            # runs when this worker next yields, so web mode writes the reminder straight away
+            response = set_reminder(task, time_str, flush=self.web_mode)
             self.speak(response)
         except Exception as e:
             logger.error(f"Error setting reminder: {str(e)}")
@@ -490,12 +892,11 @@ class VoiceAssistant:
 
     def handle_stock_price(self) -> None:
         """Handle stock price check with better conversation flow."""
-        self.speak("Which stock would you like to check? Please say the symbol.")
-        stock_symbol = self.take_command()
+        stock_symbol = self.ask("Which stock would you like to check? Please say the symbol.")
 
-        if stock_symbol and stock_symbol != "None":
+        if stock_symbol:
             try:
-                response = get_stock_price(stock_symbol.upper())
+                response = get_stock_price(stock_symbol.upper(), session=self.http)
                 self.speak(response)
             except Exception as e:
                 logger.error(f"Error getting stock price: {str(e)}")
@@ -506,23 +907,21 @@ class VoiceAssistant:
     def handle_exchange_rate(self) -> None:
         """Handle currency exchange with better conversation flow."""
         # Get base currency
-        self.speak("What is the base currency? For example, USD for US Dollar.")
-        base_currency = self.take_command()
+        base_currency = self.ask("What is the base currency? For example, USD for US Dollar.")
 
-        if not base_currency or base_currency == "None":
+        if not base_currency:
             self.speak("I couldn't understand the base currency.")
             return
 
         # Get target currency
-        self.speak("What is the target currency? For example, EUR for Euro.")
-        target_currency = self.take_command()
+        target_currency = self.ask("What is the target currency? For example, EUR for Euro.")
 
-        if not target_currency or target_currency == "None":
+        if not target_currency:
             self.speak("I couldn't understand the target currency.")
             return
 
         try:
-            response = get_exchange_rate(base_currency.upper(), target_currency.upper())
+            response = get_exchange_rate(base_currency.upper(), target_currency.upper(), session=self.http)
             self.speak(response)
         except Exception as e:
             logger.error(f"Error getting exchange rate: {str(e)}")
@@ -532,12 +931,11 @@ class VoiceAssistant:
         """Handle password generation with voice input."""
         try:
             if self.web_mode:
-                self.last_response = "What length should the password be? (default is 12)"
-                self.pending_input = "password_length"
+                self.speak("What length should the password be? (default is 12)")
+                self.request_input("password_length")
                 return
 
-            self.speak("What length would you like for the password?")
-            length_str = self.take_command()
+            length_str = self.ask("What length would you like for the password?")
 
             length = int(length_str) if length_str and length_str.isdigit() else 12
             self._process_password(length)
@@ -547,6 +945,10 @@ class VoiceAssistant:
             self.speak("I had trouble processing your request. Using default length of 12.")
             self._process_password(12)
 
+    def _answer_password_length(self, reply: str) -> None:
+        length = int(reply) if reply.isdigit() else 12
+        self._process_password(length)
+
     def _process_password(self, length):
         try:
             response = generate_password(length)
@@ -558,12 +960,11 @@ class VoiceAssistant:
 
     def handle_crypto_price(self) -> None:
         """Handle cryptocurrency price check with better conversation flow."""
-        self.speak("Which cryptocurrency would you like to check?")
-        crypto = self.take_command()
+        crypto = self.ask("Which cryptocurrency would you like to check?")
 
-        if crypto and crypto != "None":
+        if crypto:
             try:
-                response = get_crypto_price(crypto.lower())
+                response = get_crypto_price(crypto.lower(), session=self.http)
                 self.speak(response)
             except Exception as e:
                 logger.error(f"Error getting crypto price: {str(e)}")
@@ -583,13 +984,15 @@ class VoiceAssistant:
 
     def handle_gpt(self) -> None:
         """Handle GPT interaction with better conversation flow."""
-        self.speak("What would you like to ask?")
-        question = self.take_command()
+        question = self.ask("What would you like to ask?")
 
-        if question and question != "None":
+        if question:
             try:
-                response = chat_with_gpt(question)
-                self.speak(response)
+                response = chat_with_gpt(question, stream=True)
+                if isinstance(response, str):
+                    self.speak(response)
+                else:
+                    self.speak_stream(response)
             except Exception as e:
                 logger.error(f"Error with GPT: {str(e)}")
                 self.speak("Sorry, I had trouble getting a response from GPT.")
@@ -598,35 +1001,46 @@ class VoiceAssistant:
 
     def handle_free_gpt(self) -> None:
         """Handle free GPT interaction with voice input."""
-        self.speak("What would you like to ask?")
-        user_prompt = self.take_command()
+        user_prompt = self.ask("What would you like to ask?")
 
-        if user_prompt and user_prompt != "None":
-            response = chat_with_free_gpt(user_prompt)
-            self.speak(response)
+        if user_prompt:
+            try:
+                self.speak_stream(chat_with_free_gpt(user_prompt, session=self.http, stream=True))
+            except Exception as e:
+                logger.error(f"Error with free AI model: {str(e)}")
+                self.speak("Sorry, I had trouble getting a response.")
         else:
             self.speak("I couldn't understand your question. Please try again.")
 
     def handle_stop(self) -> None:
         """Handle the stop command."""
-        self.speak("Goodbye! Have a great day!")
         logger.info("Stop command received. Shutting down...")
         self.should_stop = True
         self.stop_listening()
-        if not self.web_mode:
+        if self.web_mode:
+            self.speak("Goodbye! Have a great day!")
+        else:
+            # The process exits right after, so the goodbye must finish playing first
+            self.speak_sync("Goodbye! Have a great day!")
+            # os._exit skips atexit hooks, so write out buffered reminders here
+            flush_reminders()
             os._exit(0)  # Force exit in desktop mode
 
     def run(self):
         """Main loop to run the voice assistant."""
         self.greet_me()
-        while True:
+        while not self.should_stop:
+            # Sleep until listening is switched on; the timeout lets a stop request end the loop
+            if not self._listen_event.wait(timeout=0.5):
+                continue
+            query = self.take_command()
             if self.should_stop:
                 break
-            if self.listening:
-                query = self.take_command()
-                if self.should_stop:
-                    break
+            try:
                 self.execute_command(query)
+            except Exception as e:
+                logger.error(f"Error executing command: {str(e)}")
+                self.speak(f"I encountered an error: {str(e)}")
 
 
 # Only run this if the file is run directly (not imported)
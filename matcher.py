@@ -0,0 +1,108 @@
+import re
+from typing import Any, Iterable, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
+
+class PhraseMatcher:
+    """
+    Find which of many phrases occur in a text with a single scan.
+
+    Phrases keep the order they were added in, and `first()` returns the value of the
+    earliest phrase found in the text - the same result as an ordered chain of
+    `if phrase in text` checks. Uses an Aho-Corasick automaton when pyahocorasick is
+    installed and falls back to a single compiled regex scan otherwise.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, Any]]):
+        self._phrases = []
+        seen = set()
+        for phrase, value in phrases:
+            if phrase not in seen:
+                seen.add(phrase)
+                self._phrases.append((phrase, value))
+
+        self._priority = {phrase: index for index, (phrase, _) in enumerate(self._phrases)}
+
+        self._automaton = None
+        self._pattern = None
+        if ahocorasick is not None and self._phrases:
+            automaton = ahocorasick.Automaton()
+            for index, (phrase, value) in enumerate(self._phrases):
+                automaton.add_word(phrase, (index, value))
+            automaton.make_automaton()
+            self._automaton = automaton
+        elif self._phrases:
+            # A lookahead matches at every position, so overlapping phrases are all seen;
+            # at each position the alternation picks the earliest-added phrase
+            alternation = '|'.join(re.escape(phrase) for phrase, _ in self._phrases)
+            self._pattern = re.compile(f'(?=({alternation}))')
+
+    def first(self, text: str) -> Optional[Any]:
+        """Return the value of the earliest-added phrase contained in `text`, or None."""
+        if self._automaton is not None:
+            best_index, best_value = None, None
+            for _, (index, value) in self._automaton.iter(text):
+                if best_index is None or index < best_index:
+                    best_index, best_value = index, value
+            return best_value
+
+        if self._pattern is None:
+            return None
+        best_index = None
+        for match in self._pattern.finditer(text):
+            index = self._priority[match.group(1)]
+            if best_index is None or index < best_index:
+                best_index = index
+                if index == 0:
+                    break
+        return None if best_index is None else self._phrases[best_index][1]
+
+
+class FuzzyMatcher:
+    """
+    Map a misheard query ("whether", "you tube") to the phrase it was most likely meant to be.
+
+    Each word and each pair of adjacent words of the query is scored against the phrases
+    with `rapidfuzz.fuzz.ratio`, so a near-miss has to be close to the whole phrase rather
+    than merely contained in it. Words shorter than `min_length` are never matched, and a
+    word that is only a fragment of a phrase ("pen" in "open", "mail" in "email") does not
+    count as a mishearing of it. `best()` returns None when rapidfuzz is not installed.
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, Any]], score_cutoff: float = 85, min_length: int = 4):
+        self._phrases = list(phrases)
+        self._choices = [phrase for phrase, _ in self._phrases]
+        self._score_cutoff = score_cutoff
+        self._min_length = min_length
+
+    def _candidates(self, text: str) -> Iterable[str]:
+        words = text.split()
+        yield from words
+        yield from (f'{first} {second}' for first, second in zip(words, words[1:]))
+
+    def best(self, text: str) -> Optional[Any]:
+        """Return the value of the closest phrase scoring at least `score_cutoff`, or None."""
+        if process is None:
+            return None
+        best_score, best_index = None, None
+        for candidate in self._candidates(text):
+            if len(candidate) < self._min_length:
+                continue
+            hits = process.extract(candidate, self._choices, scorer=fuzz.ratio,
+                                   score_cutoff=self._score_cutoff, limit=None)
+            for _, score, index in hits:
+                if candidate in self._choices[index]:
+                    continue
+                if best_score is None or score > best_score or (score == best_score and index < best_index):
+                    best_score, best_index = score, index
+                break
+        return None if best_index is None else self._phrases[best_index][1]
@@ -1,21 +1,37 @@
+import atexit
 import datetime
-import json
 import logging
 import os
 import random
+import re
+import secrets
 import smtplib
 import string
+import threading
+import time
 import webbrowser
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.message import EmailMessage
-from typing import List, Optional, Tuple, Union
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote, quote_plus
 
-import openai
-import psutil
-import pywhatkit as kit
+import diskcache
 import requests
-import wikipedia
-from bs4 import BeautifulSoup
+from cachetools import TTLCache
 from decouple import UndefinedValueError, config
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson decodes API responses several times faster; the stdlib parser is the fallback
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+from matcher import PhraseMatcher
 
 # Set up logging
 logging.basicConfig(
@@ -25,24 +41,98 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared connection pool for callers that don't pass their own session
+_SESSION = requests.Session()
+# One host pool per API this module talks to (about ten), with headroom
+_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                       max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]))
+_SESSION.mount('http://', _ADAPTER)
+_SESSION.mount('https://', _ADAPTER)
+atexit.register(_SESSION.close)
+
+# Worker threads for lookups that can run side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='online')
+
+# Hosts the helpers below call; the assistant runs warm_up_connections in the background at
+# start-up to pay their DNS, TCP and TLS setup before the first real command needs them
+_WARMUP_HOSTS = (
+    'http://api.openweathermap.org',
+    'https://newsapi.org',
+    'https://ipapi.co',
+    'https://api64.ipify.org',
+    'https://api.exchangerate-api.com',
+    'https://min-api.cryptocompare.com',
+    'https://www.alphavantage.co',
+    'https://en.wikipedia.org',
+    'https://api-inference.huggingface.co',
+)
+
+
+def warm_up_connections() -> None:
+    """Open a pooled connection to every API host; set BUDDY_WARMUP=false to skip it."""
+    if not config('BUDDY_WARMUP', default=True, cast=bool):
+        return
+    for host in _WARMUP_HOSTS:
+        try:
+            _SESSION.head(host, timeout=3)
+        except requests.RequestException:
+            pass
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Strips a leading question word and trailing question marks in one pass
+_TOPIC_RE = re.compile(r'^(?:what|who|where|when|why|how|tell me about|do you know|can you explain)\s+|\?+$')
+
+# Short-lived results; repeated questions within the TTL are answered without a request
+_CACHE_LOCK = threading.Lock()
+_WEATHER_CACHE = TTLCache(maxsize=256, ttl=600)
+_NEWS_CACHE = TTLCache(maxsize=4, ttl=300)
+_FX_CACHE = TTLCache(maxsize=512, ttl=3600)
+_STOCK_CACHE = TTLCache(maxsize=512, ttl=60)
+_CRYPTO_CACHE = TTLCache(maxsize=512, ttl=60)
+_IP_CACHE = TTLCache(maxsize=1, ttl=600)
+
+# Wikipedia summaries rarely change, so they are kept on disk across sessions
+_WIKI_CACHE = diskcache.Cache(os.path.join(os.path.expanduser('~'), '.buddy', 'wiki_cache'))
+_WIKI_TTL = 24 * 60 * 60
+_WIKI_DISAMBIGUATION_TTL = 60 * 60
 
-# Load API keys with proper error handling
+
+def _cache_get(cache: TTLCache, key):
+    with _CACHE_LOCK:
+        return cache.get(key)
+
+
+def _cache_put(cache: TTLCache, key, value) -> None:
+    with _CACHE_LOCK:
+        cache[key] = value
+
+
+def clear_caches() -> None:
+    """Forget every cached lookup, including the Wikipedia summaries kept on disk."""
+    with _CACHE_LOCK:
+        for cache in (_WEATHER_CACHE, _NEWS_CACHE, _FX_CACHE, _STOCK_CACHE, _CRYPTO_CACHE, _IP_CACHE, _GPT_CACHE):
+            cache.clear()
+    _WIKI_CACHE.clear()
+
+
+# Load API keys with proper error handling; each name is resolved once per process
+@lru_cache(maxsize=128)
 def get_env_var(var_name: str, default: str = None) -> str:
     """Safely get environment variable with logging."""
     try:
         value = config(var_name)
         if not value and default:
-            logger.warning(f"{var_name} not found in .env, using default value")
+            logger.warning("%s not found in .env, using default value", var_name)
             return default
         elif not value:
-            logger.error(f"{var_name} not found in .env and no default provided")
+            logger.error("%s not found in .env and no default provided", var_name)
             raise ValueError(f"{var_name} not configured")
         return value
     except UndefinedValueError:
         if default:
-            logger.warning(f"{var_name} not found in .env, using default value")
+            logger.warning("%s not found in .env, using default value", var_name)
             return default
-        logger.error(f"{var_name} not found in .env and no default provided")
+        logger.error("%s not found in .env and no default provided", var_name)
         raise ValueError(f"{var_name} not configured")
 
 
@@ -57,72 +147,109 @@ try:
     ALPHA_VANTAGE_API_KEY = get_env_var('ALPHA_VANTAGE_API_KEY')
     CRYPTO_API_KEY = get_env_var('CRYPTO_API_KEY')
 except ValueError as e:
-    logger.error(f"Environment variable error: {str(e)}")
+    logger.error("Environment variable error: %s", e)
     raise
 
 
 # ------------------- IP Address -------------------
-def find_my_ip() -> dict:
+def _ip_from_ipapi(http) -> Optional[dict]:
+    """Primary service (ipapi.co)."""
+    try:
+        response = http.get('https://ipapi.co/json/', timeout=5)
+        if response.status_code == 200:
+            data = _json_loads(response.content)
+            return {
+                'ip': data.get('ip', 'Unknown'),
+                'city': data.get('city', 'Unknown'),
+                'region': data.get('region', 'Unknown'),
+                'country': data.get('country_name', 'Unknown'),
+                'isp': data.get('org', 'Unknown'),
+                'source': 'ipapi.co'
+            }
+    except Exception as e:
+        logger.warning("Primary IP service failed: %s", e)
+    return None
+
+
+def _ip_from_ipify(http) -> Optional[dict]:
+    """First fallback (ipify + ip-api.com)."""
+    try:
+        response = http.get('https://api64.ipify.org?format=json', timeout=5)
+        if response.status_code == 200:
+            ip = _json_loads(response.content).get('ip')
+            # Get additional details from ip-api.com
+            details = _json_loads(http.get(f'http://ip-api.com/json/{ip}', timeout=5).content)
+            return {
+                'ip': ip,
+                'city': details.get('city', 'Unknown'),
+                'region': details.get('regionName', 'Unknown'),
+                'country': details.get('country', 'Unknown'),
+                'isp': details.get('isp', 'Unknown'),
+                'source': 'ipify + ip-api.com'
+            }
+    except Exception as e:
+        logger.warning("First fallback IP service failed: %s", e)
+    return None
+
+
+def _ip_from_httpbin(http) -> Optional[dict]:
+    """Second fallback (httpbin), address only."""
+    try:
+        response = http.get('https://httpbin.org/ip', timeout=5)
+        if response.status_code == 200:
+            return {
+                'ip': _json_loads(response.content).get('origin', 'Unknown'),
+                'city': 'Not available',
+                'region': 'Not available',
+                'country': 'Not available',
+                'isp': 'Not available',
+                'source': 'httpbin.org'
+            }
+    except Exception as e:
+        logger.warning("Second fallback IP service failed: %s", e)
+    return None
+
+
+_IP_PROVIDERS = (_ip_from_ipapi, _ip_from_ipify, _ip_from_httpbin)
+
+
+def find_my_ip(session: Optional[requests.Session] = None) -> dict:
     """
     Get detailed IP address information with multiple fallback options.
 
+    All providers are queried at once and the first one to answer with location
+    details wins; an address-only answer is used only if none of them do.
+
     Returns:
         dict: IP information including address, location, and ISP if available
     """
-    try:
-        # Try primary service (ipapi.co)
-        try:
-            response = requests.get('https://ipapi.co/json/', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'ip': data.get('ip', 'Unknown'),
-                    'city': data.get('city', 'Unknown'),
-                    'region': data.get('region', 'Unknown'),
-                    'country': data.get('country_name', 'Unknown'),
-                    'isp': data.get('org', 'Unknown'),
-                    'source': 'ipapi.co'
-                }
-        except Exception as e:
-            logger.warning(f"Primary IP service failed: {str(e)}")
+    cached = _cache_get(_IP_CACHE, 'ip')
+    if cached is not None:
+        return cached
 
-        # First fallback (ipify)
-        try:
-            response = requests.get('https://api64.ipify.org?format=json', timeout=5)
-            if response.status_code == 200:
-                ip = response.json().get('ip')
-                # Get additional details from ip-api.com
-                details = requests.get(f'http://ip-api.com/json/{ip}', timeout=5).json()
-                return {
-                    'ip': ip,
-                    'city': details.get('city', 'Unknown'),
-                    'region': details.get('regionName', 'Unknown'),
-                    'country': details.get('country', 'Unknown'),
-                    'isp': details.get('isp', 'Unknown'),
-                    'source': 'ipify + ip-api.com'
-                }
-        except Exception as e:
-            logger.warning(f"First fallback IP service failed: {str(e)}")
-
-        # Second fallback (httpbin)
+    http = session or _SESSION
+    try:
+        futures = [_EXECUTOR.submit(provider, http) for provider in _IP_PROVIDERS]
+        address_only = None
         try:
-            response = requests.get('https://httpbin.org/ip', timeout=5)
-            if response.status_code == 200:
-                return {
-                    'ip': response.json().get('origin', 'Unknown'),
-                    'city': 'Not available',
-                    'region': 'Not available',
-                    'country': 'Not available',
-                    'isp': 'Not available',
-                    'source': 'httpbin.org'
-                }
-        except Exception as e:
-            logger.warning(f"Second fallback IP service failed: {str(e)}")
-
+            for future in as_completed(futures):
+                info = future.result()
+                if info is None:
+                    continue
+                if info['city'] != 'Not available':
+                    _cache_put(_IP_CACHE, 'ip', info)
+                    return info
+                address_only = info
+        finally:
+            for future in futures:
+                future.cancel()
+
+        if address_only is not None:
+            return address_only
         raise Exception("All IP services failed")
 
     except Exception as e:
-        logger.error(f"Error finding IP address: {str(e)}")
+        logger.error("Error finding IP address: %s", e)
         raise
 
 
@@ -143,7 +270,7 @@ def format_ip_info(ip_info: dict) -> str:
         lines.append(f"(Data source: {ip_info['source']})")
         return "\n".join(lines)
     except Exception as e:
-        logger.error(f"Error formatting IP info: {str(e)}")
+        logger.error("Error formatting IP info: %s", e)
         return f"IP Address: {ip_info.get('ip', 'Unknown')}"
 
 
@@ -168,7 +295,7 @@ def handle_general_question(query: str) -> str:
                 if response and not response.startswith("Failed to fetch"):
                     return response
             except Exception as e:
-                logger.warning(f"OpenAI GPT failed: {str(e)}")
+                logger.warning("OpenAI GPT failed: %s", e)
 
         # Second try: Free AI model (Hugging Face)
         try:
@@ -176,20 +303,18 @@ def handle_general_question(query: str) -> str:
             if response and not response.startswith("Failed to fetch"):
                 return response
         except Exception as e:
-            logger.warning(f"Free AI model failed: {str(e)}")
+            logger.warning("Free AI model failed: %s", e)
 
         # Third try: Wikipedia for knowledge-based questions
         try:
             # Extract main topic from query
-            import re
-            topic = re.sub(r'^(what|who|where|when|why|how|tell me about|do you know|can you explain)\s+', '', query)
-            topic = re.sub(r'\?+$', '', topic)
+            topic = _TOPIC_RE.sub('', query).strip()
 
             wiki_response = search_on_wikipedia(topic)
             if not wiki_response.startswith("Sorry, I couldn't find"):
                 return wiki_response
         except Exception as e:
-            logger.warning(f"Wikipedia search failed: {str(e)}")
+            logger.warning("Wikipedia search failed: %s", e)
 
         # Final fallback: Web search suggestion
         return (
@@ -199,41 +324,79 @@ def handle_general_question(query: str) -> str:
         )
 
     except Exception as e:
-        logger.error(f"Error handling general question: {str(e)}")
+        logger.error("Error handling general question: %s", e)
         return "I apologize, but I'm having trouble processing your question. Please try rephrasing it or ask something else."
 
 
 # ------------------- Wikipedia Search -------------------
-def search_on_wikipedia(query: str) -> str:
+_WIKI_SUMMARY_URL = 'https://en.wikipedia.org/api/rest_v1/page/summary/{}'
+_WIKI_SEARCH_URL = 'https://en.wikipedia.org/w/api.php'
+
+
+def _wiki_titles(query: str, http, limit: int = 5) -> List[str]:
+    """Return the titles of the best-matching articles for `query`."""
+    response = http.get(_WIKI_SEARCH_URL, params={
+        'action': 'opensearch', 'search': query, 'limit': limit, 'namespace': 0, 'format': 'json'
+    }, timeout=5)
+    response.raise_for_status()
+    return _json_loads(response.content)[1]
+
+
+def _wiki_page(title: str, http) -> Optional[dict]:
+    """Fetch the REST summary for an exact article title, or None if there is no such page."""
+    response = http.get(_WIKI_SUMMARY_URL.format(quote(title.replace(' ', '_'), safe='')), timeout=5)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return _json_loads(response.content)
+
+
+def search_on_wikipedia(query: str, session: Optional[requests.Session] = None) -> str:
     """Search Wikipedia with improved reliability and error handling"""
-    try:
-        # Set language to English
-        wikipedia.set_lang("en")
+    key = query.strip().lower()
+    cached = _WIKI_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-        # Try to get a summary with error handling
-        try:
-            return wikipedia.summary(query, sentences=3)
-        except wikipedia.DisambiguationError as e:
-            # If there are multiple matches, use the first option
-            return f"Multiple results found. Try being more specific. Some options are: {', '.join(e.options[:5])}"
-        except wikipedia.PageError:
+    http = session or _SESSION
+    try:
+        page = _wiki_page(query, http)
+        if page is None:
+            # Not an exact title; fall back to the best search match
+            titles = _wiki_titles(query, http, limit=1)
+            page = _wiki_page(titles[0], http) if titles else None
+
+        if page is not None and page.get('type') == 'disambiguation':
+            options = f"Multiple results found. Try being more specific. Some options are: {', '.join(_wiki_titles(query, http))}"
+            _WIKI_CACHE.set(key, options, expire=_WIKI_DISAMBIGUATION_TTL)
+            return options
+
+        summary = page and (page.get('extract') or page.get('description'))
+        if not summary:
             return f"Sorry, I couldn't find any Wikipedia article about {query}"
 
+        _WIKI_CACHE.set(key, summary, expire=_WIKI_TTL)
+        return summary
+
     except Exception as e:
-        logger.error(f"Error searching Wikipedia: {str(e)}")
+        logger.error("Error searching Wikipedia: %s", e)
         raise Exception(f"Error searching Wikipedia: {str(e)}")
 
 
+@lru_cache(maxsize=1)
+def _browser() -> webbrowser.BaseBrowser:
+    """Look up the default browser once; webbrowser.open() probes for it on every call."""
+    return webbrowser.get()
+
+
 # ------------------- Google Search -------------------
 def search_on_google(query: str) -> None:
     """Search Google with improved reliability"""
     try:
-        # Properly encode the query for URL
-        encoded_query = requests.utils.quote(query)
-        url = f"https://www.google.com/search?q={encoded_query}"
-        webbrowser.open(url)
+        query = query.strip()
+        _browser().open(f"https://www.google.com/search?q={quote_plus(query)}" if query else "https://www.google.com")
     except Exception as e:
-        logger.error(f"Error searching Google: {str(e)}")
+        logger.error("Error searching Google: %s", e)
         raise Exception(f"Error performing Google search: {str(e)}")
 
 
@@ -241,52 +404,74 @@ def search_on_google(query: str) -> None:
 def youtube(query: str) -> None:
     """Search and play a video on YouTube."""
     try:
-        # Clean the search query
-        query = query.replace(' ', '+')
-        # Open in default browser
-        webbrowser.open(f'https://www.youtube.com/results?search_query={query}')
+        query = query.strip()
+        _browser().open(f'https://www.youtube.com/results?search_query={quote_plus(query)}' if query else 'https://www.youtube.com')
     except Exception as e:
-        logger.error(f"Error playing YouTube video: {str(e)}")
+        logger.error("Error playing YouTube video: %s", e)
         raise Exception(f"Error playing YouTube video: {str(e)}")
 
 
 # ------------------- Fetch News Headlines -------------------
-def get_news() -> List[str]:
+def get_news(session: Optional[requests.Session] = None) -> List[str]:
     """Get latest news headlines."""
+    return list(get_news_stream(session=session))
+
+
+def get_news_stream(session: Optional[requests.Session] = None, limit: int = 5) -> Iterator[str]:
+    """Yield the latest news headlines one at a time, so callers can start on the first right away."""
+    cached = _cache_get(_NEWS_CACHE, limit)
+    if cached is not None:
+        yield from cached
+        return
+
     try:
         if not NEWS_API_KEY:
             raise ValueError("News API key not configured")
 
-        url = f'https://newsapi.org/v2/top-headlines?country=us&apiKey={NEWS_API_KEY}'
-        response = requests.get(url)
+        url = f'https://newsapi.org/v2/top-headlines?country=us&pageSize={limit}&apiKey={NEWS_API_KEY}'
+        response = (session or _SESSION).get(url)
 
         if response.status_code == 401:
             raise ValueError("Invalid News API key")
         elif response.status_code != 200:
             raise Exception(f"News API Error: {response.status_code}")
 
-        data = response.json()
+        data = _json_loads(response.content)
         if data['status'] != 'ok':
             raise Exception(f"News API Error: {data.get('message', 'Unknown error')}")
-
-        return [article['title'] for article in data['articles'][:5]]
     except requests.RequestException as e:
-        logger.error(f"Network error in news fetch: {str(e)}")
+        logger.error("Network error in news fetch: %s", e)
         raise Exception("Network error while fetching news")
     except Exception as e:
-        logger.error(f"Error in news fetch: {str(e)}")
+        logger.error("Error in news fetch: %s", e)
         raise
 
+    headlines = []
+    for article in data['articles'][:limit]:
+        headlines.append(article['title'])
+        yield article['title']
+    _cache_put(_NEWS_CACHE, limit, tuple(headlines))
+
 
 # ------------------- Weather Forecast -------------------
-def weather_forecast(city: str) -> Tuple[str, float, float, int, float]:
+# Pull the fields the forecast needs out of an OpenWeatherMap response in two calls
+_WEATHER_SECTIONS = itemgetter('weather', 'main', 'wind')
+_WEATHER_MAIN = itemgetter('temp', 'feels_like', 'humidity')
+
+
+def weather_forecast(city: str, session: Optional[requests.Session] = None) -> Tuple[str, float, float, int, float]:
     """Get weather information for a city."""
+    key = city.strip().lower()
+    cached = _cache_get(_WEATHER_CACHE, key)
+    if cached is not None:
+        return cached
+
     try:
         if not OPENWEATHER_API_KEY:
             raise ValueError("OpenWeather API key not configured")
 
         url = f'http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric'
-        response = requests.get(url)
+        response = (session or _SESSION).get(url)
 
         if response.status_code == 401:
             raise ValueError("Invalid OpenWeather API key")
@@ -295,23 +480,60 @@ def weather_forecast(city: str) -> Tuple[str, float, float, int, float]:
         elif response.status_code != 200:
             raise Exception(f"Weather API Error: {response.status_code}")
 
-        data = response.json()
-        weather = data['weather'][0]['description']
-        temp = data['main']['temp']
-        feels_like = data['main']['feels_like']
-        humidity = data['main']['humidity']
-        wind_speed = data['wind']['speed']
-
-        return weather, temp, feels_like, humidity, wind_speed
+        conditions, main, wind = _WEATHER_SECTIONS(_json_loads(response.content))
+        result = (conditions[0]['description'], *_WEATHER_MAIN(main), wind['speed'])
+        _cache_put(_WEATHER_CACHE, key, result)
+        return result
     except requests.RequestException as e:
-        logger.error(f"Network error in weather forecast: {str(e)}")
+        logger.error("Network error in weather forecast: %s", e)
         raise Exception("Network error while fetching weather data")
     except Exception as e:
-        logger.error(f"Error in weather forecast: {str(e)}")
+        logger.error("Error in weather forecast: %s", e)
         raise
 
 
 # ------------------- Send Email -------------------
+# One authenticated SMTP connection shared by every send; the TLS handshake and login
+# happen once instead of per email
+_SMTP_LOCK = threading.Lock()
+_smtp_conn = None
+
+
+def _smtp_connection() -> smtplib.SMTP:
+    """Return the shared SMTP connection, logging in again if it has gone stale. Call with _SMTP_LOCK held."""
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPException, OSError):
+            pass
+        _close_smtp()
+
+    conn = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=10)
+    try:
+        conn.starttls()
+        conn.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+    except Exception:
+        conn.close()
+        raise
+    _smtp_conn = conn
+    return conn
+
+
+def _close_smtp() -> None:
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except (smtplib.SMTPException, OSError):
+            _smtp_conn.close()
+        _smtp_conn = None
+
+
+atexit.register(_close_smtp)
+
+
 def send_email(receiver_email: str, subject: str, message: str) -> str:
     """
     Send an email with improved validation and error handling.
@@ -333,9 +555,7 @@ def send_email(receiver_email: str, subject: str, message: str) -> str:
             raise ValueError("Email credentials not configured")
 
         # Validate email format
-        import re
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, receiver_email):
+        if not _EMAIL_RE.match(receiver_email):
             raise ValueError(f"Invalid email format: {receiver_email}")
 
         msg = EmailMessage()
@@ -344,71 +564,111 @@ def send_email(receiver_email: str, subject: str, message: str) -> str:
         msg["From"] = EMAIL_ADDRESS
         msg["To"] = receiver_email
 
-        # Attempt to send with retry logic
-        max_retries = 3
-        retry_count = 0
-
-        while retry_count < max_retries:
+        # Reuse the logged-in connection; if the server dropped it mid-send, reconnect once
+        with _SMTP_LOCK:
             try:
-                with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=10) as server:
-                    server.starttls()
-                    server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-                    server.send_message(msg)
-                return "Email sent successfully!"
+                _smtp_connection().send_message(msg)
             except smtplib.SMTPServerDisconnected:
-                retry_count += 1
-                if retry_count == max_retries:
-                    raise
-                logger.warning(f"SMTP connection failed, retrying ({retry_count}/{max_retries})")
-                continue
+                logger.warning("SMTP connection dropped, reconnecting")
+                _close_smtp()
+                _smtp_connection().send_message(msg)
+        return "Email sent successfully!"
 
     except smtplib.SMTPAuthenticationError:
         raise ValueError("Invalid email credentials - please check your email and password")
     except smtplib.SMTPRecipientsRefused:
         raise ValueError(f"Invalid recipient email address: {receiver_email}")
     except smtplib.SMTPException as e:
-        logger.error(f"SMTP error: {str(e)}")
+        logger.error("SMTP error: %s", e)
         raise Exception(f"Failed to send email: {str(e)}")
     except Exception as e:
-        logger.error(f"Error in email send: {str(e)}")
+        logger.error("Error in email send: %s", e)
         raise
 
 
 # ------------------- Set Reminder -------------------
-def set_reminder(task, time):
-    with open("reminders.txt", "a") as file:
-        file.write(f"{time} - {task}\n")
+# Reminders are buffered and written out together, at most a second after the first one is set
+_REMINDER_FLUSH_DELAY = 1.0
+_REMINDER_BUFFER = deque()
+_REMINDER_LOCK = threading.Lock()
+_reminder_file = None
+_reminder_timer = None
+
+
+def flush_reminders() -> None:
+    """Write any buffered reminders to reminders.txt."""
+    global _reminder_file, _reminder_timer
+    with _REMINDER_LOCK:
+        if _reminder_timer is not None:
+            _reminder_timer.cancel()
+            _reminder_timer = None
+        if not _REMINDER_BUFFER:
+            return
+        if _reminder_file is None:
+            _reminder_file = open("reminders.txt", "a")
+        _reminder_file.writelines(_REMINDER_BUFFER)
+        _REMINDER_BUFFER.clear()
+        _reminder_file.flush()
+
+
+def _close_reminders() -> None:
+    flush_reminders()
+    if _reminder_file is not None:
+        _reminder_file.close()
+
+
+atexit.register(_close_reminders)
+
+
+def set_reminder(task, time, flush=False):
+    global _reminder_timer
+    with _REMINDER_LOCK:
+        _REMINDER_BUFFER.append(f"{time} - {task}\n")
+        if _reminder_timer is None and not flush:
+            _reminder_timer = threading.Timer(_REMINDER_FLUSH_DELAY, flush_reminders)
+            _reminder_timer.daemon = True
+            _reminder_timer.start()
+    if flush:
+        flush_reminders()
     return f"Reminder set for: {time} - {task}"
 
 
 # ------------------- Fetch Stock Price -------------------
-def get_stock_price(stock_symbol):
+def get_stock_price(stock_symbol, session=None):
     try:
         if not ALPHA_VANTAGE_API_KEY:
             return "Please set up your Alpha Vantage API key in the .env file"
 
+        cached = _cache_get(_STOCK_CACHE, stock_symbol.upper())
+        if cached is not None:
+            return cached
+
         url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={stock_symbol}&apikey={ALPHA_VANTAGE_API_KEY}'
-        response = requests.get(url)
-        data = response.json()
+        response = (session or _SESSION).get(url)
+        data = _json_loads(response.content)
 
         if "Global Quote" not in data or not data["Global Quote"]:
             return f"Could not find stock information for {stock_symbol}"
 
         price = data["Global Quote"]["05. price"]
-        return f"The current price of {stock_symbol} is ${price}"
+        result = f"The current price of {stock_symbol} is ${price}"
+        _cache_put(_STOCK_CACHE, stock_symbol.upper(), result)
+        return result
 
     except Exception as e:
-        logger.error(f"Error getting stock price: {str(e)}")
+        logger.error("Error getting stock price: %s", e)
         raise Exception(f"Error getting stock price: {str(e)}")
 
 
-def get_exchange_rate(base_currency: str, target_currency: str) -> str:
+def get_exchange_rate(base_currency: str, target_currency: str,
+                      session: Optional[requests.Session] = None) -> str:
     """
     Get currency exchange rate with improved validation and error handling.
 
     Args:
         base_currency (str): Source currency code (e.g., 'USD')
         target_currency (str): Target currency code (e.g., 'EUR')
+        session (requests.Session, optional): Session to reuse connections from
 
     Returns:
         str: Formatted exchange rate information
@@ -432,15 +692,19 @@ def get_exchange_rate(base_currency: str, target_currency: str) -> str:
 
         while retry_count < max_retries:
             try:
-                url = f'https://api.exchangerate-api.com/v4/latest/{base_currency}'
-                response = requests.get(url, timeout=timeout_seconds)
+                # One response carries every rate for the base currency, so it serves any target
+                data = _cache_get(_FX_CACHE, base_currency)
+                if data is None:
+                    url = f'https://api.exchangerate-api.com/v4/latest/{base_currency}'
+                    response = (session or _SESSION).get(url, timeout=timeout_seconds)
 
-                if response.status_code == 404:
-                    raise ValueError(f"Invalid currency code: {base_currency}")
-                elif response.status_code != 200:
-                    raise Exception(f"API Error (Status {response.status_code}): {response.text}")
+                    if response.status_code == 404:
+                        raise ValueError(f"Invalid currency code: {base_currency}")
+                    elif response.status_code != 200:
+                        raise Exception(f"API Error (Status {response.status_code}): {response.text}")
 
-                data = response.json()
+                    data = _json_loads(response.content)
+                    _cache_put(_FX_CACHE, base_currency, data)
 
                 if target_currency not in data['rates']:
                     raise ValueError(f"Invalid target currency: {target_currency}")
@@ -459,48 +723,57 @@ def get_exchange_rate(base_currency: str, target_currency: str) -> str:
                 retry_count += 1
                 if retry_count == max_retries:
                     raise Exception("Failed to get exchange rate: Connection timeout")
-                logger.warning(f"Request timeout, retrying ({retry_count}/{max_retries})")
+                logger.warning("Request timeout, retrying (%s/%s)", retry_count, max_retries)
                 continue
 
             except requests.RequestException as e:
-                logger.error(f"Network error in exchange rate fetch: {str(e)}")
+                logger.error("Network error in exchange rate fetch: %s", e)
                 raise Exception("Network error while fetching exchange rate")
 
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise
     except Exception as e:
-        logger.error(f"Error getting exchange rate: {str(e)}")
+        logger.error("Error getting exchange rate: %s", e)
         raise
 
 
 # ------------------- Generate Random Password -------------------
+# Passwords draw from the OS CSPRNG rather than the predictable `random` module
+_PASSWORD_ALPHABET = string.ascii_letters + string.digits + string.punctuation
+# Random bytes at or above this are discarded so every character is equally likely
+_PASSWORD_BYTE_LIMIT = 256 - 256 % len(_PASSWORD_ALPHABET)
+_SYSTEM_RANDOM = secrets.SystemRandom()
+
+
+def _random_password_chars(count: int) -> List[str]:
+    """Draw `count` alphabet characters from a single batch of random bytes (rarely more)."""
+    chars = []
+    while len(chars) < count:
+        raw = secrets.token_bytes(2 * (count - len(chars)))
+        chars.extend(_PASSWORD_ALPHABET[b % len(_PASSWORD_ALPHABET)] for b in raw if b < _PASSWORD_BYTE_LIMIT)
+    return chars[:count]
+
+
 def generate_password(length: int = 12) -> str:
     """Generate a secure random password."""
     try:
         if length < 8:
             length = 12  # Minimum secure length
 
-        # Define character sets
-        lowercase = string.ascii_lowercase
-        uppercase = string.ascii_uppercase
-        digits = string.digits
-        symbols = string.punctuation
-
         # Ensure at least one character from each set
         password = [
-            random.choice(lowercase),
-            random.choice(uppercase),
-            random.choice(digits),
-            random.choice(symbols)
+            secrets.choice(string.ascii_lowercase),
+            secrets.choice(string.ascii_uppercase),
+            secrets.choice(string.digits),
+            secrets.choice(string.punctuation)
         ]
 
         # Fill the rest randomly
-        for _ in range(length - 4):
-            password.append(random.choice(lowercase + uppercase + digits + symbols))
+        password += _random_password_chars(length - 4)
 
         # Shuffle the password
-        random.shuffle(password)
+        _SYSTEM_RANDOM.shuffle(password)
         password = ''.join(password)
 
         return f"Generated password: {password}"
@@ -509,28 +782,36 @@ def generate_password(length: int = 12) -> str:
 
 
 # ------------------- Fetch Cryptocurrency Prices -------------------
-def get_crypto_price(crypto_symbol):
+def get_crypto_price(crypto_symbol, session=None):
     try:
         if not CRYPTO_API_KEY:
             return "Please set up your CryptoCompare API key in the .env file"
 
+        cached = _cache_get(_CRYPTO_CACHE, crypto_symbol.upper())
+        if cached is not None:
+            return cached
+
         url = f'https://min-api.cryptocompare.com/data/price?fsym={crypto_symbol.upper()}&tsyms=USD&api_key={CRYPTO_API_KEY}'
-        response = requests.get(url)
-        data = response.json()
+        response = (session or _SESSION).get(url)
+        data = _json_loads(response.content)
 
         if 'USD' not in data:
             return f"Could not find price for {crypto_symbol}"
 
         price = data['USD']
-        return f"The current price of {crypto_symbol.upper()} is ${price:,.2f}"
+        result = f"The current price of {crypto_symbol.upper()} is ${price:,.2f}"
+        _cache_put(_CRYPTO_CACHE, crypto_symbol.upper(), result)
+        return result
 
     except Exception as e:
-        logger.error(f"Error getting crypto price: {str(e)}")
+        logger.error("Error getting crypto price: %s", e)
         raise Exception(f"Error getting crypto price: {str(e)}")
 
 
 # ------------------- Check System Battery Percentage -------------------
 def get_battery_status():
+    import psutil
+
     try:
         battery = psutil.sensors_battery()
         if battery:
@@ -540,52 +821,124 @@ def get_battery_status():
             return f"Battery is at {percent}% and is {status}"
         return "Could not get battery information"
     except Exception as e:
-        logger.error(f"Error getting battery status: {str(e)}")
+        logger.error("Error getting battery status: %s", e)
         raise Exception(f"Error getting battery status: {str(e)}")
 
 
 # ------------------- Get Current Date & Time -------------------
+@lru_cache(maxsize=1)
+def _format_datetime(second: int) -> str:
+    # Keyed by the whole second, so repeated calls within a second reuse the string
+    return datetime.datetime.fromtimestamp(second).strftime("It's %I:%M %p on %A, %B %d, %Y")
+
+
 def get_current_datetime():
     try:
-        now = datetime.datetime.now()
-        return now.strftime("It's %I:%M %p on %A, %B %d, %Y")
+        return _format_datetime(int(time.time()))
     except Exception as e:
-        logger.error(f"Error getting date and time: {str(e)}")
+        logger.error("Error getting date and time: %s", e)
         raise Exception(f"Error getting date and time: {str(e)}")
 
 
-def chat_with_gpt(prompt):
-    API_KEY = os.getenv("OPENAI_API_KEY")  # ✅ Get API key from .env
+# Recent answers, so a repeated question doesn't cost another completion
+_GPT_CACHE = TTLCache(maxsize=128, ttl=600)
 
-    if not API_KEY:
-        return "API Key not found. Make sure to set OPENAI_API_KEY in the .env file."
+# Caps on in-flight model requests, so a burst of web commands queues here instead of
+# tripping the providers' rate limits
+_OPENAI_SLOTS = threading.BoundedSemaphore(config('OPENAI_MAX_CONCURRENCY', default=20, cast=int))
+_HF_SLOTS = threading.BoundedSemaphore(config('HF_MAX_CONCURRENCY', default=4, cast=int))
 
-    try:
-        openai.api_key = API_KEY
-        response = openai.ChatCompletion.create(
+
+@lru_cache(maxsize=1)
+def _openai_client():
+    """Create the OpenAI client once; it keeps its own connection pool."""
+    from openai import OpenAI
+    # Fail over to the free model quickly rather than after the client's default 10 minute timeout
+    return OpenAI(api_key=OPENAI_API_KEY, timeout=15, max_retries=2)
+
+
+def _stream_gpt(prompt: str) -> Iterator[str]:
+    """Yield the completion for `prompt` piece by piece, caching the full answer once it has arrived."""
+    key = prompt.strip().lower()
+    cached = _cache_get(_GPT_CACHE, key)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    with _OPENAI_SLOTS:
+        response = _openai_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            stream=True
         )
-        return response["choices"][0]["message"]["content"].strip()
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                parts.append(content)
+                yield content
+    _cache_put(_GPT_CACHE, key, ''.join(parts).strip())
+
+
+def chat_with_gpt(prompt, stream: bool = False) -> Union[str, Iterator[str]]:
+    """
+    Ask OpenAI's chat model a question.
+
+    With `stream=True` the answer is returned as a generator of text pieces as they
+    arrive, so speech can start before the completion is finished.
+    """
+    if not OPENAI_API_KEY:
+        return "API Key not found. Make sure to set OPENAI_API_KEY in the .env file."
+
+    if stream:
+        return _stream_gpt(prompt)
+
+    try:
+        return ''.join(_stream_gpt(prompt)).strip()
 
     except Exception as e:
         return f"Failed to fetch GPT response: {str(e)}"
 
 
-import requests
+# ------------------- Chat with Free AI (Hugging Face) -------------------
+_HF_API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct"
 
 
-# ------------------- Chat with Free AI (Hugging Face) -------------------
-def chat_with_free_gpt(prompt):
+def _stream_free_gpt(prompt: str, http) -> Iterator[str]:
+    """Yield generated tokens from the Hugging Face server-sent event stream."""
+    headers = {"Authorization": ""}  # Get from Hugging Face
+    with _HF_SLOTS, http.post(_HF_API_URL, headers=headers, json={"inputs": prompt, "stream": True},
+                              stream=True) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            token = _json_loads(line[5:]).get("token") or {}
+            if token.get("text") and not token.get("special"):
+                yield token["text"]
+
+
+def chat_with_free_gpt(prompt, session=None, stream: bool = False) -> Union[str, Iterator[str]]:
+    """
+    Ask the free Hugging Face model a question.
+
+    With `stream=True` the answer is returned as a generator of tokens as they are
+    generated; errors are then raised to the caller instead of returned as text.
+    """
+    if stream:
+        return _stream_free_gpt(prompt, session or _SESSION)
+
     try:
-        API_URL = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct"
         headers = {"Authorization": ""}  # Get from Hugging Face
 
-        response = requests.post(API_URL, headers=headers, json={"inputs": prompt})
-        answer = response.json()
+        with _HF_SLOTS:
+            response = (session or _SESSION).post(_HF_API_URL, headers=headers, json={"inputs": prompt})
+        answer = _json_loads(response.content)
 
         if isinstance(answer, list) and len(answer) > 0:
             return answer[0]["generated_text"]
@@ -608,9 +961,7 @@ def handle_email_input() -> Tuple[str, str, str]:
         # Get and validate receiver's email
         while True:
             receiver_email = input("Enter recipient's email address: ").strip()
-            import re
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if re.match(email_pattern, receiver_email):
+            if _EMAIL_RE.match(receiver_email):
                 break
             print("Invalid email format. Please try again.")
 
@@ -639,7 +990,7 @@ def handle_email_input() -> Tuple[str, str, str]:
     except KeyboardInterrupt:
         raise ValueError("Email composition cancelled by user")
     except Exception as e:
-        logger.error(f"Error in email input: {str(e)}")
+        logger.error("Error in email input: %s", e)
         raise
 
 
@@ -688,7 +1039,7 @@ def handle_exchange_rate_input() -> Tuple[str, str]:
     except KeyboardInterrupt:
         raise ValueError("Currency exchange rate request cancelled by user")
     except Exception as e:
-        logger.error(f"Error in exchange rate input: {str(e)}")
+        logger.error("Error in exchange rate input: %s", e)
         raise
 
 
@@ -708,10 +1059,94 @@ def get_exchange_rate_with_input() -> str:
         return f"Failed to get exchange rate: {str(e)}"
 
 
+# Conversation phrases, built once. The exact-match table answers the common one-phrase
+# turns ("hi", "thanks", "bye") before falling back to a single matcher scan.
+_BOT_NAME_LOWER = get_env_var('BOT', 'Assistant').lower()
+
+_GREETING_PHRASES = (
+    'hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening',
+    'hello buddy', 'hi buddy', 'hey buddy', 'hello assistant', 'hi assistant',
+    'greetings', 'start', 'wake up', f"hello {_BOT_NAME_LOWER}"
+)
+_HOW_ARE_YOU_PHRASES = (
+    'how are you', 'how do you do', 'how are you doing',
+    'whats up', "what's up", 'how is it going', 'how are things',
+    'how have you been', 'how do you feel', 'are you well',
+    f"how are you {_BOT_NAME_LOWER}", f"how are you doing {_BOT_NAME_LOWER}"
+)
+_THANKS_PHRASES = (
+    'thank you', 'thanks', 'thank you so much', 'thanks a lot',
+    'appreciate it', 'thanks buddy', f'thank you {_BOT_NAME_LOWER}',
+    'thx', 'ty', 'thanks for your help'
+)
+_GOODBYE_PHRASES = (
+    'goodbye', 'bye', 'see you', 'see you later', 'good night',
+    'bye bye', 'catch you later', 'have a good one', 'take care',
+    f'goodbye {_BOT_NAME_LOWER}', f'bye {_BOT_NAME_LOWER}'
+)
+_NAME_QUERY_PHRASES = (
+    'what is your name', 'who are you', 'what should i call you',
+    'what are you called', 'introduce yourself', 'what are you',
+    'what is this', 'who am i talking to'
+)
+# Categories are listed in the order they are checked; the matcher gives earlier phrases priority
+_CONVERSATION_PHRASES = [
+    (phrase, category)
+    for category, phrases in (
+        ('greeting', _GREETING_PHRASES),
+        ('how_are_you', _HOW_ARE_YOU_PHRASES),
+        ('thanks', _THANKS_PHRASES),
+        ('goodbye', _GOODBYE_PHRASES),
+        ('name', _NAME_QUERY_PHRASES),
+    )
+    for phrase in phrases
+]
+_CONVERSATION_EXACT = {phrase: category for phrase, category in reversed(_CONVERSATION_PHRASES)}
+_CONVERSATION_MATCHER = PhraseMatcher(_CONVERSATION_PHRASES)
+
+
+# Picks conversational replies; passwords use secrets instead
+_RNG = random.Random()
+
+# Response templates, filled in with str.format when chosen
+_GREETING_TEMPLATES = (
+    "{greeting}, {user_name}! I'm {bot_name}, your personal assistant. How can I help you today?",
+    "{greeting}! Great to see you, {user_name}. I'm ready to assist you!",
+    "Welcome back, {user_name}! Hope you're having a wonderful {weekday}.",
+    "{greeting}! I'm {bot_name}, here to help with whatever you need."
+)
+_CONVERSATION_RESPONSES = {
+    'how_are_you': (
+        "I'm doing great, {user_name}! Thank you for asking. How can I assist you today?",
+        "I'm functioning perfectly! What can I help you with?",
+        "All systems operational and ready to help, {user_name}! What's on your mind?",
+        "I'm excellent! Always happy to chat and help. What do you need?"
+    ),
+    'thanks': (
+        "You're welcome, {user_name}! Let me know if you need anything else.",
+        "Glad I could help! Don't hesitate to ask if you need more assistance.",
+        "My pleasure! Is there anything else you'd like to know?",
+        "You're welcome, {user_name}! Have a great day!"
+    ),
+    'goodbye': (
+        "Goodbye, {user_name}! Have a great day!",
+        "See you later, {user_name}! Don't hesitate to come back if you need help!",
+        "Bye for now! Take care!",
+        "Goodbye! Remember, I'm here 24/7 if you need assistance!"
+    ),
+    'name': (
+        "I'm {bot_name}, your personal AI assistant! I'm here to help you with various tasks.",
+        "My name is {bot_name}, and I'm your AI companion. I can help you with emails, searches, weather updates, and much more!",
+        "You can call me {bot_name}. I'm your AI assistant, ready to help with whatever you need!"
+    ),
+}
+
+
 def get_greeting() -> str:
     """Get appropriate greeting based on time of day."""
     try:
-        hour = datetime.datetime.now().hour
+        now = datetime.datetime.now()
+        hour = now.hour
 
         if 5 <= hour < 12:
             greeting = "Good morning"
@@ -722,21 +1157,15 @@ def get_greeting() -> str:
         else:
             greeting = "Hello"
 
-        # Get user name from environment if available
-        user_name = get_env_var('USER', 'there')
-        bot_name = get_env_var('BOT', 'Assistant')
-
-        greetings = [
-            f"{greeting}, {user_name}! I'm {bot_name}, your personal assistant. How can I help you today?",
-            f"{greeting}! Great to see you, {user_name}. I'm ready to assist you!",
-            f"Welcome back, {user_name}! Hope you're having a wonderful {datetime.datetime.now().strftime('%A')}.",
-            f"{greeting}! I'm {bot_name}, here to help with whatever you need."
-        ]
-
-        return random.choice(greetings)
+        return _RNG.choice(_GREETING_TEMPLATES).format(
+            greeting=greeting,
+            user_name=get_env_var('USER', 'there'),
+            bot_name=get_env_var('BOT', 'Assistant'),
+            weekday=now.strftime('%A')
+        )
 
     except Exception as e:
-        logger.error(f"Error generating greeting: {str(e)}")
+        logger.error("Error generating greeting: %s", e)
         return "Hello! How can I help you today?"
 
 
@@ -759,91 +1188,66 @@ def handle_basic_conversation(query: str) -> Optional[str]:
         # Convert to lowercase and remove punctuation
         clean_query = query.lower().strip('?!.,')
 
-        # Get bot name from environment
-        bot_name = get_env_var('BOT', 'Assistant').lower()
-        user_name = get_env_var('USER', 'there')
-
-        # Basic greetings with more variations
-        greetings = [
-            'hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening',
-            'hello buddy', 'hi buddy', 'hey buddy', 'hello assistant', 'hi assistant',
-            'greetings', 'start', 'wake up'
-        ]
+        category = _CONVERSATION_EXACT.get(clean_query) or _CONVERSATION_MATCHER.first(clean_query)
+        if category is None:
+            return None
 
-        # Check for greetings including bot name
-        if (clean_query in greetings or
-                f"hello {bot_name}" in clean_query or
-                any(greeting in clean_query for greeting in greetings)):
+        # Greetings depend on the time of day
+        if category == 'greeting':
             return get_greeting()
 
-        # How are you variations with more patterns
-        how_are_you = [
-            'how are you', 'how do you do', 'how are you doing',
-            'whats up', "what's up", 'how is it going', 'how are things',
-            'how have you been', 'how do you feel', 'are you well',
-            f"how are you {bot_name}", f"how are you doing {bot_name}"
-        ]
-        if any(phrase in clean_query for phrase in how_are_you):
-            responses = [
-                f"I'm doing great, {user_name}! Thank you for asking. How can I assist you today?",
-                "I'm functioning perfectly! What can I help you with?",
-                f"All systems operational and ready to help, {user_name}! What's on your mind?",
-                "I'm excellent! Always happy to chat and help. What do you need?"
-            ]
-            return random.choice(responses)
-
-        # Thank you variations with more patterns
-        thanks = [
-            'thank you', 'thanks', 'thank you so much', 'thanks a lot',
-            'appreciate it', 'thanks buddy', f'thank you {bot_name}',
-            'thx', 'ty', 'thanks for your help'
-        ]
-        if any(phrase in clean_query for phrase in thanks):
-            responses = [
-                f"You're welcome, {user_name}! Let me know if you need anything else.",
-                "Glad I could help! Don't hesitate to ask if you need more assistance.",
-                "My pleasure! Is there anything else you'd like to know?",
-                f"You're welcome, {user_name}! Have a great day!"
-            ]
-            return random.choice(responses)
-
-        # Goodbye variations with more patterns
-        goodbyes = [
-            'goodbye', 'bye', 'see you', 'see you later', 'good night',
-            'bye bye', 'catch you later', 'have a good one', 'take care',
-            f'goodbye {bot_name}', f'bye {bot_name}'
-        ]
-        if any(phrase in clean_query for phrase in goodbyes):
-            responses = [
-                f"Goodbye, {user_name}! Have a great day!",
-                f"See you later, {user_name}! Don't hesitate to come back if you need help!",
-                "Bye for now! Take care!",
-                f"Goodbye! Remember, I'm here 24/7 if you need assistance!"
-            ]
-            return random.choice(responses)
-
-        # Name queries with more patterns
-        name_queries = [
-            'what is your name', 'who are you', 'what should i call you',
-            'what are you called', 'introduce yourself', 'what are you',
-            'what is this', 'who am i talking to'
-        ]
-        if any(phrase in clean_query for phrase in name_queries):
-            bot_name = get_env_var('BOT', 'Assistant')
-            responses = [
-                f"I'm {bot_name}, your personal AI assistant! I'm here to help you with various tasks.",
-                f"My name is {bot_name}, and I'm your AI companion. I can help you with emails, searches, weather updates, and much more!",
-                f"You can call me {bot_name}. I'm your AI assistant, ready to help with whatever you need!"
-            ]
-            return random.choice(responses)
-
-        return None
+        return _RNG.choice(_CONVERSATION_RESPONSES[category]).format(
+            user_name=get_env_var('USER', 'there'),
+            bot_name=get_env_var('BOT', 'Assistant')
+        )
 
     except Exception as e:
-        logger.error(f"Error in conversation handling: {str(e)}")
+        logger.error("Error in conversation handling: %s", e)
         return None
 
 
+def _ip_reply(command: str) -> str:
+    return format_ip_info(find_my_ip())
+
+
+def _news_reply(command: str) -> str:
+    headlines = get_news()
+    return "Here are the latest headlines:\n" + "\n".join(f"- {headline}" for headline in headlines)
+
+
+def _weather_reply(command: str) -> str:
+    # Extract city name or ask for it
+    city = command.replace("weather", "").strip()
+    if not city:
+        return "Which city would you like to know the weather for?"
+    weather, temp, feels_like, humidity, wind = weather_forecast(city)
+    return f"Weather in {city}:\n{weather.capitalize()}\nTemperature: {temp}°C (Feels like: {feels_like}°C)\nHumidity: {humidity}%\nWind Speed: {wind} m/s"
+
+
+# Trigger phrases for each intent, in priority order
+_INTENT_PHRASES = {
+    "ip": ("ip address", "my ip"),
+    "email": ("send email", "compose email"),
+    "exchange_rate": ("exchange rate", "currency rate"),
+    "news": ("news", "headlines"),
+    "weather": ("weather",),
+    "datetime": ("time", "date"),
+    "battery": ("battery",),
+}
+_INTENT_MATCHER = PhraseMatcher(
+    (phrase, intent) for intent, phrases in _INTENT_PHRASES.items() for phrase in phrases
+)
+_DISPATCH = {
+    "ip": _ip_reply,
+    "email": lambda command: send_email_with_input(),
+    "exchange_rate": lambda command: get_exchange_rate_with_input(),
+    "news": _news_reply,
+    "weather": _weather_reply,
+    "datetime": lambda command: get_current_datetime(),
+    "battery": lambda command: get_battery_status(),
+}
+
+
 def process_command(command: str) -> str:
     """
     Process user commands with improved handling for all features.
@@ -865,43 +1269,9 @@ def process_command(command: str) -> str:
         if conversation_response:
             return conversation_response
 
-        # Check for specific commands
-        if "ip address" in command or "my ip" in command:
-            ip_info = find_my_ip()
-            return format_ip_info(ip_info)
-
-        elif "send email" in command or "compose email" in command:
-            return send_email_with_input()
-
-        elif "exchange rate" in command or "currency rate" in command:
-            return get_exchange_rate_with_input()
-
-        elif "news" in command or "headlines" in command:
-            headlines = get_news()
-            return "Here are the latest headlines:\n" + "\n".join(f"- {headline}" for headline in headlines)
-
-        elif "weather" in command:
-            # Extract city name or ask for it
-            city = command.replace("weather", "").strip()
-            if not city:
-                return "Which city would you like to know the weather for?"
-            weather, temp, feels_like, humidity, wind = weather_forecast(city)
-            return f"Weather in {city}:\n{weather.capitalize()}\nTemperature: {temp}°C (Feels like: {feels_like}°C)\nHumidity: {humidity}%\nWind Speed: {wind} m/s"
-
-        elif "time" in command or "date" in command:
-            return get_current_datetime()
-
-        elif "battery" in command:
-            return get_battery_status()
-
-        # Handle general questions
-        elif any(q in command for q in
-                 ["what's", "who", "where", "when", "why", "how", "tell me", "do you know", "can you explain"]):
-            return handle_general_question(command)
-
-        # If no other matches, treat as a general question
-        return handle_general_question(command)
+        # Check for specific commands; anything else is treated as a general question
+        return _DISPATCH.get(_INTENT_MATCHER.first(command), handle_general_question)(command)
 
     except Exception as e:
-        logger.error(f"Error processing command: {str(e)}")
+        logger.error("Error processing command: %s", e)
         return f"Sorry, I encountered an error: {str(e)}"
@@ -0,0 +1,70 @@
+import pytest
+
+import matcher
+from matcher import FuzzyMatcher, PhraseMatcher
+
+PHRASES = [
+    ("youtube", "youtube"), ("play", "youtube"), ("google", "google"), ("search", "google"),
+    ("wikipedia", "wikipedia"), ("weather", "weather"), ("email", "email"), ("stock", "stock"),
+    ("exchange rate", "exchange rate"), ("battery", "battery"), ("open", "open"),
+]
+
+# Overlapping and nested phrases, in the priority order an if-chain would test them
+OVERLAPPING = [
+    ("open youtube", "open youtube"), ("open", "open"), ("youtube", "youtube"), ("you", "you"),
+    ("exchange rate", "exchange rate"), ("rate", "rate"), ("stock", "stock"), ("stockholm", "stockholm"),
+    ("a", "a"),
+]
+
+
+def if_chain(phrases, text):
+    return next((value for phrase, value in phrases if phrase in text), None)
+
+
+@pytest.fixture(params=["ahocorasick", "regex"])
+def phrase_matcher(request, monkeypatch):
+    if request.param == "ahocorasick":
+        pytest.importorskip("ahocorasick")
+    else:
+        monkeypatch.setattr(matcher, "ahocorasick", None)
+    return lambda phrases: PhraseMatcher(phrases)
+
+
+@pytest.mark.parametrize("phrases", [PHRASES, OVERLAPPING, list(reversed(OVERLAPPING))])
+@pytest.mark.parametrize("text", [
+    "", "open youtube", "please open youtube now", "youtube open", "open you tube", "search google",
+    "what is the exchange rate", "rate the stock", "stockholm weather", "xyz", "a", "play some music",
+])
+def test_phrase_matcher_agrees_with_if_chain(phrase_matcher, phrases, text):
+    assert phrase_matcher(phrases).first(text) == if_chain(phrases, text)
+
+
+def test_phrase_matcher_keeps_first_duplicate(phrase_matcher):
+    assert phrase_matcher([("open", "first"), ("open", "second")]).first("open it") == "first"
+
+
+def test_phrase_matcher_without_phrases(phrase_matcher):
+    assert phrase_matcher([]).first("anything") is None
+
+
+@pytest.fixture(scope="module")
+def fuzzy_matcher():
+    pytest.importorskip("rapidfuzz")
+    return FuzzyMatcher(PHRASES)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("what is the whether today", "weather"),
+    ("you tube", "youtube"),
+    ("check batery", "battery"),
+    ("wikipedea", "wikipedia"),
+])
+def test_misheard_phrase_matches(fuzzy_matcher, query, expected):
+    assert fuzzy_matcher.best(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "go", "a", "the", "at", "ip", "rate", "mail", "pen", "i am stuck", "hello there", "how are you",
+])
+def test_unrelated_query_does_not_match(fuzzy_matcher, query):
+    assert fuzzy_matcher.best(query) is None